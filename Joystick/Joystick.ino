@@ -111,6 +111,9 @@ void setup() {
 
   loadCalibration();
   delay(1000);
+
+  // host tools wait for this line instead of sleeping after a flash
+  Serial.println("READY");
 }
 
 // ==========================================
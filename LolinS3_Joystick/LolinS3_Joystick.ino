@@ -101,6 +101,8 @@ void setup() {
 
   Serial.println("Lolin S3 Joystick (no OLED) started");
   Serial.print("FW: "); Serial.println(FW_VERSION);
+  // host tools wait for this line instead of sleeping after a flash
+  Serial.println("READY");
 }
 
 // ==========================================
@@ -9,14 +9,18 @@ Run: python calibrator_gui.py
 Requires: pyserial
 """
 
+import codecs
+import collections
+import functools
+import json
 import threading
-import queue
 import time
 import tkinter as tk
 import tkinter.font as tkfont
 import os
 import re
-from tkinter import ttk, scrolledtext, messagebox
+import sys
+from tkinter import ttk, messagebox
 
 try:
     import serial
@@ -26,39 +30,251 @@ except Exception:
     raise
 
 BAUDRATE = 115200
-READ_TIMEOUT = 0.1
+# reads block until data arrives; disconnect() interrupts them with cancel_read()
+READ_TIMEOUT = None
+# upper bound for a single serial read, like a BufferedReader buffer_size
+READ_CHUNK = 4096
+# the serial log keeps at most LOG_MAX_LINES, dropping LOG_TRIM_LINES at a time
+LOG_MAX_LINES = 5000
+LOG_TRIM_LINES = 1000
+# minimum seconds between two renders of the serial log during a burst
+LOG_FLUSH_INTERVAL = 0.05
+# bytes the reader thread can buffer ahead of the GUI
+RX_RING_SIZE = 1 << 16
+
+# comports() results are reused for this many seconds
+PORTS_CACHE_TTL = 2.0
+_ports_cache = {'t': 0.0, 'v': []}
+
+# Linux serial_struct ioctls (linux/serial.h); flags is the fifth int field
+_TIOCGSERIAL = 0x541E
+_TIOCSSERIAL = 0x541F
+_ASYNC_LOW_LATENCY = 0x2000
+
+# pre-encoded payloads for the fixed firmware commands
+_CMD_BYTES = {
+    'next': b'next\n',
+    'viz': b'viz\n',
+    'run': b'run\n',
+    'version': b'version\n',
+    'debug': b'debug\n',
+    'cal': b'cal\n',
+}
+
+# remembers the last port that connected, so startup can skip enumeration
+CONFIG_PATH = os.path.join(os.path.expanduser('~'), '.esp32_joystick.json')
+
+# firmware answers the 'version' command with e.g. "FW_VERSION:1.0.0"
+_FW_VERSION_RE = re.compile(r'FW_VERSION\s*[:=]?\s*(\d+\.\d+\.\d+)')
+
+
+def _list_ports():
+    """Device names of the available serial ports, cached for PORTS_CACHE_TTL."""
+    now = time.monotonic()
+    if _ports_cache['t'] and now - _ports_cache['t'] < PORTS_CACHE_TTL:
+        return list(_ports_cache['v'])
+    ports = [p.device for p in serial.tools.list_ports.comports()]
+    _ports_cache['v'] = ports
+    _ports_cache['t'] = now
+    return list(ports)
+
+
+def _invalidate_ports_cache():
+    _ports_cache['t'] = 0.0
+
+
+def _load_config():
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            cfg = json.load(f)
+        if isinstance(cfg, dict):
+            return cfg
+    except Exception:
+        pass
+    return {}
+
+
+def _save_config(cfg):
+    try:
+        with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cfg, f)
+    except Exception:
+        pass
+
+
+def _lower_usb_latency(port):
+    """Drop the USB-serial latency timer to 1 ms where the driver exposes it.
+
+    FTDI-style bridges on Linux (ttyUSB*) default to 16 ms, which batches small
+    replies; CDC-ACM ports and other platforms have no such knob, so this is
+    best effort.
+    """
+    if not sys.platform.startswith('linux'):
+        return
+    name = os.path.basename(os.path.realpath(port))
+    try:
+        with open(f'/sys/bus/usb-serial/devices/{name}/latency_timer', 'w') as f:
+            f.write('1')
+    except OSError:
+        # not a usb-serial device, or no permission to tune it
+        pass
+
+
+def _set_async_low_latency(ser):
+    """Set ASYNC_LOW_LATENCY on the tty so the kernel pushes bytes up without
+    its usual coalescing delay. Linux only, best effort."""
+    if not sys.platform.startswith('linux'):
+        return
+    try:
+        import fcntl
+        import struct
+        fd = ser.fileno()
+        buf = bytearray(128)  # larger than struct serial_struct on any ABI
+        fcntl.ioctl(fd, _TIOCGSERIAL, buf)
+        flags = struct.unpack_from('i', buf, 16)[0]
+        if not flags & _ASYNC_LOW_LATENCY:
+            struct.pack_into('i', buf, 16, flags | _ASYNC_LOW_LATENCY)
+            fcntl.ioctl(fd, _TIOCSSERIAL, buf)
+    except Exception:
+        # driver without TIOCGSERIAL support (e.g. some CDC-ACM builds) or no permission
+        pass
+
+
+class _ByteRing:
+    """Fixed-size single-producer/single-consumer byte ring.
+
+    Only the reader thread advances tail and only the consumer advances head,
+    so no lock is needed. If the consumer falls a whole buffer behind, new
+    bytes are dropped rather than overwriting unread ones.
+    """
+    def __init__(self, size=RX_RING_SIZE):
+        self._buf = bytearray(size)
+        self._size = size
+        self._head = 0
+        self._tail = 0
+
+    def write(self, data):
+        n = min(len(data), self._size - (self._tail - self._head))
+        if n <= 0:
+            return 0
+        pos = self._tail % self._size
+        first = min(n, self._size - pos)
+        view = memoryview(data)
+        self._buf[pos:pos + first] = view[:first]
+        if n > first:
+            self._buf[:n - first] = view[first:n]
+        # publish only after the bytes are in place
+        self._tail += n
+        return n
+
+    def read(self):
+        tail = self._tail
+        n = tail - self._head
+        if not n:
+            return b''
+        pos = self._head % self._size
+        first = min(n, self._size - pos)
+        data = bytes(self._buf[pos:pos + first])
+        if n > first:
+            data += self._buf[:n - first]
+        self._head = tail
+        return data
 
 
 class SerialManager:
-    """Simple serial backend that reads lines and dispatches them to a queue."""
-    def __init__(self, out_queue):
+    """Simple serial backend that buffers received bytes for the GUI.
+
+    The reader thread copies raw bytes into a ring buffer; the consumer
+    collects complete lines with read_lines(). on_data, if given, is called
+    from the reader thread after each chunk so the consumer can wake up
+    instead of polling. A consumer with its own event loop can instead
+    connect with reader=False, watch fileno() and call read_ready().
+    Writes are queued and sent by a writer thread so the caller never
+    blocks on the port.
+    """
+    def __init__(self, on_data=None):
         self.serial = None
         self.port = None
         self.alive = False
         self.thread = None
-        self.out_q = out_queue
-
-    def connect(self, port, baud=BAUDRATE):
+        self.on_data = on_data
+        self._ring = _ByteRing()
+        # consumer side: one decoder for the whole stream keeps UTF-8 sequences
+        # that straddle reads intact; _rxtail holds the unterminated last line
+        self._dec = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._rxtail = ''
+        # outgoing payloads, drained by the writer thread; connect() makes a
+        # fresh queue, wakeup and stop event so threads of an old connection
+        # never see the new one
+        self._tx = collections.deque()
+        self._tx_evt = threading.Event()
+        self._stop = threading.Event()
+        self.writer = None
+        # messages from the writer thread, reported by read_lines()
+        self._notices = collections.deque()
+        # while version_wanted is set the reader flags chunks containing
+        # FW_VERSION, so the GUI only runs its regex when a reply is in flight
+        self.version_wanted = threading.Event()
+        self.version_hint = False
+        self._scan_tail = b''
+        # kept in step with connect/disconnect so callers can test the link
+        # without a getattr chain through the pyserial object
+        self.is_connected = False
+
+    def connect(self, port, baud=BAUDRATE, reader=True):
         if not port:
             raise RuntimeError('No port')
-        if self.serial and getattr(self.serial, 'is_open', False) and self.port == port:
+        if self.is_connected and self.port == port:
             return
         self.disconnect()
         self.port = port
         self.serial = serial.Serial(port, baud, timeout=READ_TIMEOUT)
+        _lower_usb_latency(port)
+        _set_async_low_latency(self.serial)
+        self._ring = _ByteRing()
+        self._dec.reset()
+        self._rxtail = ''
+        self._tx = collections.deque()
+        self._tx_evt = threading.Event()
+        self._stop = threading.Event()
         self.alive = True
-        self.thread = threading.Thread(target=self._read_loop, daemon=True)
-        self.thread.start()
+        self.is_connected = True
+        if reader:
+            self.start_reader()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True,
+                                       args=(self.serial, self._tx, self._tx_evt, self._stop))
+        self.writer.start()
 
     def disconnect(self):
         try:
             self.alive = False
+            self.is_connected = False
+            self._stop.set()
+            if self.serial:
+                # wake the reader out of its blocking read so join() returns at once
+                try:
+                    self.serial.cancel_read()
+                except Exception:
+                    pass
+                # likewise for a writer stuck behind flow control
+                try:
+                    self.serial.cancel_write()
+                except Exception:
+                    pass
             if self.thread:
                 try:
-                    self.thread.join(timeout=0.5)
+                    self.thread.join(timeout=0.1)
                 except Exception:
                     pass
                 self.thread = None
+            if self.writer:
+                # the stop event is already set; this only wakes the writer
+                self._tx_evt.set()
+                try:
+                    self.writer.join(timeout=0.1)
+                except Exception:
+                    pass
+                self.writer = None
             if self.serial:
                 try:
                     self.serial.close()
@@ -69,32 +285,146 @@ class SerialManager:
         except Exception:
             pass
 
-    def _read_loop(self):
-        while self.alive and self.serial and getattr(self.serial, 'is_open', False):
+    def start_reader(self):
+        # bound per connection: a reader outliving its disconnect() join must
+        # not read the next connection's port or write into its ring
+        self.thread = threading.Thread(target=self._read_loop, daemon=True,
+                                       args=(self.serial, self._ring, self._stop))
+        self.thread.start()
+
+    def _read_loop(self, ser, ring, stop):
+        while not stop.is_set():
             try:
-                line = self.serial.readline()
-                if not line:
-                    time.sleep(0.01)
-                    continue
-                try:
-                    text = line.decode(errors='replace')
-                except Exception:
-                    text = str(line)
-                try:
-                    self.out_q.put(text)
-                except Exception:
-                    pass
+                # wait for the first byte: pyserial blocks in select() on POSIX
+                # (and an overlapped wait on Windows), so there is no sleep/poll
+                chunk = ser.read(1)
+                if not chunk:
+                    # only cancel_read() makes an untimed read return empty
+                    break
+                # then drain the rest of the burst in the same wakeup
+                n = ser.in_waiting
+                if n:
+                    chunk += ser.read(min(n, READ_CHUNK))
+                self._feed(chunk, ring)
+                self._notify()
             except Exception as e:
-                try:
-                    self.out_q.put(f"<ERROR reading serial: {e}>\n")
-                except Exception:
-                    pass
+                # an error from a port we were told to drop is just the close
+                if not stop.is_set():
+                    self._read_failed(e, ring)
+                    self._notify()
                 break
 
+    def fileno(self):
+        return self.serial.fileno()
+
+    def read_ready(self):
+        """Buffer whatever the port has ready, for connect(reader=False).
+
+        Call when fileno() polls readable. Returns False once the link has
+        failed; the error is reported through read_lines().
+        """
+        try:
+            n = self.serial.in_waiting
+            self._feed(self.serial.read(min(n, READ_CHUNK) if n else 1), self._ring)
+        except Exception as e:
+            self._read_failed(e, self._ring)
+            return False
+        return True
+
+    def _feed(self, chunk, ring):
+        if self.version_wanted.is_set():
+            # carry a few bytes over so a token split across reads is seen
+            if b'FW_VERSION' in self._scan_tail + chunk:
+                self.version_hint = True
+            self._scan_tail = chunk[-9:]
+        ring.write(chunk)
+
+    def _read_failed(self, e, ring):
+        self.is_connected = False
+        ring.write(f"<ERROR reading serial: {e}>\n".encode())
+
+    def watch_for_version(self, on):
+        """Start or stop flagging received FW_VERSION replies (Tk thread)."""
+        self.version_hint = False
+        self._scan_tail = b''
+        if on:
+            self.version_wanted.set()
+        else:
+            self.version_wanted.clear()
+
+    def read_lines(self):
+        """Return every complete line received since the last call as one str.
+
+        Consumer (Tk thread) only. A trailing partial line is held back until
+        its newline arrives.
+        """
+        notices = ''
+        while self._notices:
+            notices += self._notices.popleft()
+        data = self._ring.read()
+        if not data:
+            return notices
+        text = self._rxtail + self._dec.decode(data)
+        i = text.rfind('\n')
+        if i < 0:
+            self._rxtail = text
+            return notices
+        self._rxtail = text[i + 1:]
+        return notices + text[:i + 1]
+
+    def _notify(self):
+        if self.on_data:
+            try:
+                self.on_data()
+            except Exception:
+                pass
+
     def write(self, cmd: str):
-        if not (self.serial and getattr(self.serial, 'is_open', False)):
+        self.write_bytes((cmd + '\n').encode())
+
+    def write_bytes(self, payload: bytes):
+        # queue only; the writer thread does the (possibly blocking) port write
+        if not self.is_connected:
             raise RuntimeError('Serial not open')
-        self.serial.write((cmd + '\n').encode())
+        self._tx.append(payload)
+        self._tx_evt.set()
+
+    def _write_loop(self, ser, tx, tx_evt, stop):
+        # every write goes through this one thread, so on POSIX the raw fd can
+        # be written directly without pyserial's per-call checks or a lock.
+        # ser, its fd and the queue belong to one connection; once stop is set
+        # the fd may be closed (and its number reused), so it is never touched
+        fd = None
+        if os.name == 'posix':
+            try:
+                fd = ser.fileno()
+            except Exception:
+                fd = None
+        while True:
+            tx_evt.wait()
+            tx_evt.clear()
+            if stop.is_set():
+                break
+            items = []
+            while tx:
+                items.append(tx.popleft())
+            if not items:
+                continue
+            try:
+                # everything queued since the last wakeup goes out in one write
+                data = b''.join(items)
+                n = 0
+                if fd is not None:
+                    try:
+                        n = os.write(fd, data)
+                    except BlockingIOError:
+                        pass
+                if n < len(data):
+                    # the port is non-blocking: let pyserial wait for room
+                    ser.write(data[n:])
+            except Exception as e:
+                self._notices.append(f"<ERROR writing serial: {e}>\n")
+                self._notify()
 
 
 
@@ -103,29 +433,46 @@ class CalibratorGUI:
         self.root = root
         self.root.title("ESP32 Joystick Calibrator")
 
-        # queue receives lines from SerialManager
-        self.q = queue.Queue()
-        self.serial_manager = SerialManager(self.q)
+        # SerialManager buffers incoming bytes; we collect lines on <<SerialData>>
+        self.serial_manager = SerialManager(on_data=self._notify_serial_data)
         # settings: selected port and output visibility
         self.settings_port = tk.StringVar()
         # legacy attributes (kept for compatibility)
         self.serial = None
         self.read_thread = None
         self.alive = threading.Event()
+        # newline count currently held by the log widget
+        self._log_lines = 0
+        # line-granular copy of the log so Copy All doesn't serialize the Text widget
+        self._log_mirror = collections.deque(maxlen=LOG_MAX_LINES)
+        # text logged during the current Tk tick, flushed by one after_idle insert
+        self._pending_log = []
+        self._log_flush_id = None
+        self._last_log_flush = 0.0
+        # set once the user opens Settings, so auto-connect doesn't override their choice
+        self._user_touched_port = False
+        self._cfg = _load_config()
 
         self._build_ui()
-        self._poll_serial_queue()
-
-        # load latest version from repo (used as GitHub reference)
-        try:
-            base = os.path.dirname(__file__)
-            with open(os.path.join(base, 'version.txt'), 'r', encoding='utf-8') as f:
-                self.latest_version = f.read().strip()
-        except Exception:
-            self.latest_version = None
+        # the reader thread wakes us whenever it buffers data: through a pipe
+        # watched by Tk where supported, otherwise with a <<SerialData>> event
+        self._wake_r = self._wake_w = None
+        self._setup_wakeup_pipe()
+        # on POSIX Tk watches the serial fd itself (see _open_port)
+        self._serial_fd = None
+        self.root.bind('<<SerialData>>', self._drain_serial)
+        self._poll_serial()
+
+        # latest version from repo (used as GitHub reference), read off the Tk thread
+        self.latest_version = None
+        threading.Thread(target=self._load_version_file, daemon=True).start()
 
         self.device_version = None
         self.awaiting_version = False
+        # pending after() id for _version_timeout, if any
+        self._ver_timeout_id = None
+
+        self._startup_connect()
 
     def _build_ui(self):
         style = ttk.Style()
@@ -167,11 +514,12 @@ class CalibratorGUI:
 
         btn_opts = {'width': 16}
         ttk.Button(controls, text="Calibrate", command=self.open_calibration_dialog, **btn_opts).grid(row=0, column=0, padx=4, pady=3)
-        ttk.Button(controls, text="Next", command=lambda: self.send_cmd("next"), **btn_opts).grid(row=1, column=0, padx=4, pady=3)
-        ttk.Button(controls, text="Visualize", command=lambda: self.send_cmd("viz"), **btn_opts).grid(row=2, column=0, padx=4, pady=3)
-        ttk.Button(controls, text="Run", command=lambda: self.send_cmd("run"), **btn_opts).grid(row=3, column=0, padx=4, pady=3)
-        ttk.Button(controls, text="Version", command=lambda: self.send_cmd("version"), **btn_opts).grid(row=4, column=0, padx=4, pady=3)
-        ttk.Button(controls, text="Toggle Debug", command=lambda: self.send_cmd("debug"), **btn_opts).grid(row=5, column=0, padx=4, pady=3)
+        write = self._write_bytes
+        ttk.Button(controls, text="Next", command=functools.partial(write, _CMD_BYTES['next']), **btn_opts).grid(row=1, column=0, padx=4, pady=3)
+        ttk.Button(controls, text="Visualize", command=functools.partial(write, _CMD_BYTES['viz']), **btn_opts).grid(row=2, column=0, padx=4, pady=3)
+        ttk.Button(controls, text="Run", command=functools.partial(write, _CMD_BYTES['run']), **btn_opts).grid(row=3, column=0, padx=4, pady=3)
+        ttk.Button(controls, text="Version", command=functools.partial(write, _CMD_BYTES['version']), **btn_opts).grid(row=4, column=0, padx=4, pady=3)
+        ttk.Button(controls, text="Toggle Debug", command=functools.partial(write, _CMD_BYTES['debug']), **btn_opts).grid(row=5, column=0, padx=4, pady=3)
 
         # Settings
         dz_frame = ttk.LabelFrame(left, text='Settings')
@@ -182,12 +530,16 @@ class CalibratorGUI:
         ttk.Button(dz_frame, text="Set", command=self.set_deadzone).grid(row=0, column=2, padx=6)
 
         self.show_output = tk.BooleanVar(value=True)
+        # mirror the checkbox in a plain bool so the per-chunk paths skip a Tcl round-trip
+        self._show_output = True
+        self.show_output.trace_add('write', lambda *_: setattr(self, '_show_output', self.show_output.get()))
         ttk.Checkbutton(dz_frame, text="Show Serial Output", variable=self.show_output, command=self._update_output_visibility).grid(row=1, column=0, columnspan=3, sticky='w', padx=6, pady=(0, 6))
 
-        # Status
-        self.status_var = tk.StringVar(value="Disconnected")
-        status = ttk.Label(left, textvariable=self.status_var, relief='ridge', padding=6)
-        status.grid(row=4, column=0, sticky='we', pady=(10, 0))
+        # Status: set through _set_status(); a plain -text option has no
+        # variable traces to fire, unlike a StringVar
+        self.status_label = ttk.Label(left, text="Disconnected", relief='ridge', padding=6)
+        self.status_label.grid(row=4, column=0, sticky='we', pady=(10, 0))
+        self._status_text = "Disconnected"
 
         # Right: serial log
         self.log_frame = ttk.LabelFrame(right, text="Serial Log")
@@ -195,21 +547,69 @@ class CalibratorGUI:
         right.rowconfigure(0, weight=1)
         right.columnconfigure(0, weight=1)
 
-        self.log = scrolledtext.ScrolledText(self.log_frame, height=20, state="disabled", wrap="none", font=mono_font)
+        # plain Text + Scrollbar: the log is append-only, so keep undo history off
+        self.log = tk.Text(self.log_frame, height=20, wrap="none", font=mono_font,
+                           undo=False, maxundo=0, autoseparators=False)
         self.log.grid(row=0, column=0, sticky="nsew")
+        log_scroll = ttk.Scrollbar(self.log_frame, orient=tk.VERTICAL, command=self.log.yview)
+        log_scroll.grid(row=0, column=1, sticky="ns")
+        self.log.configure(yscrollcommand=log_scroll.set)
+        # the log stays in 'normal' state so appends don't toggle it; swallow user edits instead
+        self.log.bind('<Key>', self._block_log_edit)
+        for seq in ('<<Paste>>', '<<PasteSelection>>', '<<Cut>>'):
+            self.log.bind(seq, lambda e: 'break')
 
         log_buttons = ttk.Frame(self.log_frame)
-        log_buttons.grid(row=1, column=0, sticky='e', pady=(6, 0))
+        log_buttons.grid(row=1, column=0, columnspan=2, sticky='e', pady=(6, 0))
         ttk.Button(log_buttons, text="Clear Log", command=self.clear_log).grid(row=0, column=0, padx=4)
         ttk.Button(log_buttons, text="Copy All", command=self.copy_log).grid(row=0, column=1, padx=4)
 
-        self.refresh_ports()
-        # attempt auto-connect after UI settles
-        self.root.after(200, self._auto_connect)
+    def _startup_connect(self):
+        # try last session's port directly; enumeration is only needed if that fails
+        port = self._cfg.get('port')
+        if port:
+            try:
+                self._open_port(port)
+            except Exception:
+                pass
+            else:
+                self.settings_port.set(port)
+                self._set_status(f"Connected: {port} @ {BAUDRATE}")
+                self.query_device_version()
+                return
+        # enumerate ports off the Tk thread (slow on Windows), then auto-connect
+        threading.Thread(target=self._enumerate_ports, daemon=True).start()
+
+    def _remember_port(self, port):
+        if self._cfg.get('port') != port:
+            self._cfg['port'] = port
+            _save_config(self._cfg)
+
+    def _enumerate_ports(self):
+        # runs on a worker thread; hand the result back to the Tk thread
+        try:
+            port_list = _list_ports()
+        except Exception:
+            port_list = []
+        try:
+            self.root.after(0, self._on_ports_enumerated, port_list)
+        except Exception:
+            pass
+
+    def _on_ports_enumerated(self, port_list):
+        if port_list and not self.settings_port.get():
+            try:
+                self.settings_port.set(port_list[0])
+            except Exception:
+                pass
+        # only guess when there is a single candidate and the user hasn't picked one
+        if len(port_list) == 1 and not self._user_touched_port:
+            self._auto_connect(port_list)
+        elif len(port_list) > 1 and not self._user_touched_port:
+            self._set_status("Disconnected - choose a port in Settings")
 
     def refresh_ports(self):
-        ports = serial.tools.list_ports.comports()
-        port_list = [p.device for p in ports]
+        port_list = _list_ports()
         # keep settings_port in sync if empty
         if port_list and not self.settings_port.get():
             try:
@@ -218,8 +618,9 @@ class CalibratorGUI:
                 pass
         return port_list
 
-    def _auto_connect(self):
-        ports = self.refresh_ports()
+    def _auto_connect(self, ports=None):
+        if ports is None:
+            ports = self.refresh_ports()
         if ports and len(ports) > 0:
             # if no settings port chosen, use first
             try:
@@ -247,24 +648,27 @@ class CalibratorGUI:
         try:
             # disconnect first if manager already connected to different port
             try:
-                if getattr(self.serial_manager, 'serial', None) and getattr(self.serial_manager.serial, 'is_open', False):
-                    current = getattr(self.serial_manager.serial, 'port', None)
+                if self.serial_manager.is_connected:
+                    current = self.serial_manager.port
                     if current and current != port:
-                        self.serial_manager.disconnect()
+                        self._close_port()
             except Exception:
                 pass
-            self.serial_manager.connect(port)
+            self._open_port(port)
         except Exception as e:
+            # the port list may be stale (device unplugged or renumbered)
+            _invalidate_ports_cache()
             messagebox.showerror("Connection Failed", str(e))
             return
-        self.status_var.set(f"Connected: {port} @ {BAUDRATE}")
+        self._set_status(f"Connected: {port} @ {BAUDRATE}")
+        self._remember_port(port)
         # query firmware version after connecting
         self.query_device_version()
 
     def disconnect(self):
         # disconnect shared backend
         try:
-            self.serial_manager.disconnect()
+            self._close_port()
         except Exception:
             pass
         # legacy cleanup
@@ -280,108 +684,267 @@ class CalibratorGUI:
         except Exception:
             pass
         self.serial = None
-        self.status_var.set("Disconnected")
+        self._set_status("Disconnected")
         try:
             self.connect_btn.config(text='Connect')
         except Exception:
             pass
 
     def _read_loop(self):
-        # reading is handled by SerialManager which pushes into self.q
+        # reading is handled by SerialManager which buffers for _drain_serial
         return
 
-    def _poll_serial_queue(self):
+    def _open_port(self, port):
+        if self.serial_manager.is_connected and self.serial_manager.port == port:
+            return
+        self._remove_serial_handler()
+        if os.name != 'posix':
+            self.serial_manager.connect(port)
+            return
+        # let Tk's event loop read the port directly: no reader thread and no
+        # wakeup hop; the thread is only the fallback when that can't be set up
+        self.serial_manager.connect(port, reader=False)
+        try:
+            fd = self.serial_manager.fileno()
+            self.root.tk.createfilehandler(fd, tk.READABLE, self._on_serial_readable)
+        except Exception:
+            self.serial_manager.start_reader()
+            return
+        self._serial_fd = fd
+
+    def _close_port(self):
+        self._remove_serial_handler()
+        self.serial_manager.disconnect()
+
+    def _remove_serial_handler(self):
+        if self._serial_fd is None:
+            return
+        try:
+            self.root.tk.deletefilehandler(self._serial_fd)
+        except Exception:
+            pass
+        self._serial_fd = None
+
+    def _on_serial_readable(self, fd, mask):
+        if not self.serial_manager.read_ready():
+            # the port failed (e.g. unplugged): stop watching a dead fd
+            self._remove_serial_handler()
+        self._drain_serial()
+
+    def _setup_wakeup_pipe(self):
+        # createfilehandler is only available on POSIX Tk builds
+        try:
+            r, w = os.pipe()
+        except OSError:
+            return
+        try:
+            self.root.tk.createfilehandler(r, tk.READABLE, self._on_wakeup)
+        except Exception:
+            os.close(r)
+            os.close(w)
+            return
+        # a full pipe already means a wakeup is pending, so never block the writer
+        os.set_blocking(r, False)
+        os.set_blocking(w, False)
+        self._wake_r, self._wake_w = r, w
+
+    def _close_wakeup_pipe(self):
+        if self._wake_r is None:
+            return
         try:
-            while True:
-                msg = self.q.get_nowait()
-                # check for version string first
-                if self.awaiting_version:
-                    m = re.search(r'FW_VERSION\s*[:=]?\s*([0-9]+\.[0-9]+\.[0-9]+)', msg)
-                    if m:
-                        self.device_version = m.group(1)
-                        self.awaiting_version = False
-                        self._update_version_label()
-                if self.show_output.get():
-                    self.append_log(msg)
-        except queue.Empty:
+            self.root.tk.deletefilehandler(self._wake_r)
+        except Exception:
             pass
-        self.root.after(100, self._poll_serial_queue)
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._wake_r = self._wake_w = None
+
+    def _notify_serial_data(self):
+        # called from the reader thread; a pipe write never waits on the Tcl interpreter
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b'\0')
+            except OSError:
+                pass
+            return
+        self.root.event_generate('<<SerialData>>', when='tail')
+
+    def _on_wakeup(self, fd, mask):
+        try:
+            os.read(fd, 4096)
+        except OSError:
+            pass
+        self._drain_serial()
+
+    def _poll_serial(self):
+        # watchdog only: normal delivery is driven by <<SerialData>> events
+        self._drain_serial()
+        self.root.after(500, self._poll_serial)
+
+    def _drain_serial(self, event=None):
+        # collect everything buffered since the last wakeup and hit the Text widget once
+        text = self.serial_manager.read_lines()
+        if not text:
+            return
+        # the reader already scanned the raw bytes for FW_VERSION; the hint
+        # stays set until the reply's line is complete and matched here
+        if self.awaiting_version and self.serial_manager.version_hint:
+            m = _FW_VERSION_RE.search(text)
+            if m:
+                self.device_version = m.group(1)
+                self.awaiting_version = False
+                self.serial_manager.watch_for_version(False)
+                self._cancel_version_timeout()
+                self._update_version_label()
+        if self._show_output:
+            self.append_log(text)
 
     def append_log(self, text):
+        # serial output and command echoes share one insert; after a render,
+        # further text is held back until LOG_FLUSH_INTERVAL has passed
+        self._pending_log.append(text)
+        if self._log_flush_id is None:
+            wait = self._last_log_flush + LOG_FLUSH_INTERVAL - time.monotonic()
+            if wait > 0:
+                self._log_flush_id = self.root.after(int(wait * 1000) + 1, self._flush_log)
+            else:
+                self._log_flush_id = self.root.after_idle(self._flush_log)
+
+    def _flush_log(self):
+        self._log_flush_id = None
+        self._last_log_flush = time.monotonic()
+        if not self._pending_log:
+            return
+        text = ''.join(self._pending_log)
+        self._pending_log.clear()
         try:
-            self.log.configure(state='normal')
             self.log.insert('end', text)
-            self.log.see('end')
-            self.log.configure(state='disabled')
+            self._log_mirror.extend(text.splitlines(keepends=True))
+            self._log_lines += text.count('\n')
+            if self._log_lines > LOG_MAX_LINES:
+                # trim from the top so the Text widget stays small on long sessions
+                self.log.delete('1.0', f'{LOG_TRIM_LINES + 1}.0')
+                self._log_lines -= LOG_TRIM_LINES
+            self.log.yview_moveto(1.0)
         except Exception:
             pass
 
     def clear_log(self):
-        self.log.configure(state='normal')
+        self._pending_log.clear()
         self.log.delete('1.0', 'end')
-        self.log.configure(state='disabled')
+        self._log_lines = 0
+        self._log_mirror.clear()
+
+    def _block_log_edit(self, event):
+        # allow navigation and Ctrl+C / Ctrl+A, reject anything that would edit the text
+        if event.keysym in ('Left', 'Right', 'Up', 'Down', 'Home', 'End', 'Prior', 'Next'):
+            return None
+        if event.state & 0x4 and event.keysym.lower() in ('c', 'a'):
+            return None
+        return 'break'
 
     def copy_log(self):
         try:
-            txt = self.log.get('1.0', 'end')
+            txt = ''.join(self._log_mirror)
             self.root.clipboard_clear()
             self.root.clipboard_append(txt)
         except Exception:
             pass
 
     def send_cmd(self, cmd):
+        # known commands skip the concat/encode; anything else is encoded once here
+        payload = _CMD_BYTES.get(cmd) or (cmd + '\n').encode()
         # prefer the shared serial manager
-        try:
-            if self.serial_manager and getattr(self.serial_manager, 'serial', None) and getattr(self.serial_manager.serial, 'is_open', False):
-                try:
-                    self.serial_manager.write(cmd)
-                    if self.show_output.get():
-                        self.append_log(f"> {cmd}\n")
-                    return
-                except Exception as e:
-                    messagebox.showerror("Send Failed", str(e))
-                    return
-        except Exception:
-            pass
+        if self.serial_manager.is_connected:
+            self._write_bytes(payload)
+            return
 
         if not (self.serial and getattr(self.serial, 'is_open', False)):
             messagebox.showwarning("Not Connected", "Open a serial connection first.")
             return
         try:
-            self.serial.write((cmd + "\n").encode())
-            if self.show_output.get():
+            self.serial.write(payload)
+            if self._show_output:
                 self.append_log(f"> {cmd}\n")
         except Exception as e:
             messagebox.showerror("Send Failed", str(e))
 
+    def _write_bytes(self, payload):
+        # fast path for the fixed button commands: payload is already encoded
+        try:
+            self.serial_manager.write_bytes(payload)
+        except RuntimeError:
+            messagebox.showwarning("Not Connected", "Open a serial connection first.")
+            return
+        if self._show_output:
+            self.append_log("> " + payload.decode())
+
     def query_device_version(self):
-        # send version request and wait for response handled in _poll_serial_queue
+        # send version request and wait for response handled in _drain_serial
         # prefer shared manager
         try:
-            if not (self.serial_manager and getattr(self.serial_manager, 'serial', None) and getattr(self.serial_manager.serial, 'is_open', False)):
+            if not self.serial_manager.is_connected:
                 return
         except Exception:
             return
+        # a reconnect restarts the wait rather than stacking another timeout
+        self._cancel_version_timeout()
         self.awaiting_version = True
+        self.serial_manager.watch_for_version(True)
         try:
             self.send_cmd("version")
         except Exception:
             pass
         # timeout if no response in 2s
-        self.root.after(2000, self._version_timeout)
+        self._ver_timeout_id = self.root.after(2000, self._version_timeout)
+
+    def _cancel_version_timeout(self):
+        if self._ver_timeout_id:
+            try:
+                self.root.after_cancel(self._ver_timeout_id)
+            except Exception:
+                pass
+            self._ver_timeout_id = None
 
     def _version_timeout(self):
+        self._ver_timeout_id = None
         if self.awaiting_version:
             self.awaiting_version = False
+            self.serial_manager.watch_for_version(False)
             # mark as unknown
             self.device_version = None
             self._update_version_label()
 
+    def _load_version_file(self):
+        try:
+            base = os.path.dirname(__file__)
+            with open(os.path.join(base, 'version.txt'), 'r', encoding='utf-8') as f:
+                latest = f.read().strip()
+        except Exception:
+            return
+        try:
+            self.root.after(0, self._set_latest_version, latest)
+        except Exception:
+            pass
+
+    def _set_status(self, text):
+        if text != self._status_text:
+            self._status_text = text
+            self.status_label.configure(text=text)
+
+    def _set_latest_version(self, latest):
+        self.latest_version = latest
+        # refresh the label only if a version query has already shown it
+        if hasattr(self, 'ver_label'):
+            self._update_version_label()
+
     def _update_version_label(self):
         # create label if missing
         if not hasattr(self, 'ver_label'):
-            self.ver_var = tk.StringVar(value='')
-            self.ver_label = tk.Label(self.root, textvariable=self.ver_var)
+            self.ver_label = tk.Label(self.root)
             # place it under status (use grid) — find left frame location
             try:
                 # assume left frame is at grid row 0/col 0 of paned; place near status
@@ -395,14 +958,14 @@ class CalibratorGUI:
             text = "Device: unknown"
         if self.latest_version:
             text += f"   Latest: {self.latest_version}"
-        self.ver_var.set(text)
 
-        # color
+        # text and color in one configure call
+        if self.device_version and self.latest_version and self.device_version != self.latest_version:
+            fg = 'red'
+        else:
+            fg = 'green'
         try:
-            if self.device_version and self.latest_version and self.device_version != self.latest_version:
-                self.ver_label.config(fg='red')
-            else:
-                self.ver_label.config(fg='green')
+            self.ver_label.config(text=text, fg=fg)
         except Exception:
             pass
 
@@ -410,7 +973,7 @@ class CalibratorGUI:
         # Open a modal dialog with calibration instructions. Send initial 'cal' command.
         # prefer shared manager
         try:
-            if not (self.serial_manager and getattr(self.serial_manager, 'serial', None) and getattr(self.serial_manager.serial, 'is_open', False)):
+            if not self.serial_manager.is_connected:
                 messagebox.showwarning("Not Connected", "Open a serial connection first.")
                 return
         except Exception:
@@ -442,7 +1005,7 @@ class CalibratorGUI:
 
         def on_next():
             # Send 'next' and advance dialog
-            self.send_cmd("next")
+            self._write_bytes(_CMD_BYTES['next'])
             step_state['index'] += 1
             if step_state['index'] < len(steps):
                 instr_var.set(steps[step_state['index']])
@@ -462,13 +1025,14 @@ class CalibratorGUI:
 
     def open_settings(self):
         # modal settings dialog to choose COM port and serial output visibility
+        self._user_touched_port = True
         dlg = tk.Toplevel(self.root)
         dlg.title("Settings")
         dlg.transient(self.root)
         dlg.grab_set()
 
         ttk.Label(dlg, text="COM Port:").grid(row=0, column=0, sticky='w', padx=8, pady=(8,4))
-        ports = [p.device for p in serial.tools.list_ports.comports()]
+        ports = _list_ports()
         port_cb = ttk.Combobox(dlg, values=ports, state='readonly', width=28, textvariable=self.settings_port)
         port_cb.grid(row=0, column=1, padx=8, pady=(8,4))
 
@@ -482,14 +1046,16 @@ class CalibratorGUI:
             if sel:
                 try:
                     # if manager already connected to other port, restart
-                    if getattr(self.serial_manager, 'serial', None) and getattr(self.serial_manager.serial, 'is_open', False):
-                        current = getattr(self.serial_manager.serial, 'port', None)
+                    if self.serial_manager.is_connected:
+                        current = self.serial_manager.port
                         if current and current != sel:
-                            self.serial_manager.disconnect()
-                    if not getattr(self.serial_manager, 'serial', None) or not getattr(self.serial_manager.serial, 'is_open', False):
-                        self.serial_manager.connect(sel)
-                        self.status_var.set(f"Connected: {sel} @ {BAUDRATE}")
+                            self._close_port()
+                    if not self.serial_manager.is_connected:
+                        self._open_port(sel)
+                        self._set_status(f"Connected: {sel} @ {BAUDRATE}")
+                        self._remember_port(sel)
                 except Exception as e:
+                    _invalidate_ports_cache()
                     messagebox.showerror("Connection Failed", str(e))
                     # keep dialog open for retry
                     return
@@ -528,6 +1094,7 @@ class CalibratorGUI:
 
     def on_close(self):
         self.disconnect()
+        self._close_wakeup_pipe()
         self.root.destroy()
 
 
@@ -1,25 +1,132 @@
 # ...existing code...
-import os, threading, subprocess, requests, serial, time
+import os, re, json, hashlib, shutil, threading, subprocess, serial, time, contextlib, codecs, select
+from collections import deque
 import serial.tools.list_ports
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 
+# run esptool in-process when it is importable; otherwise spawn the CLI
+try:
+    import esptool
+except ImportError:
+    esptool = None
+
 CHIP = "auto"
-BAUD_FLASH = "921600"
+# not every USB-UART bridge or cable holds 1.5 Mbit; retry once at the old rate
+BAUD_FLASH = "1500000"
+BAUD_FLASH_FALLBACK = "921600"
 BAUD_SERIAL = 115200
 
 # Use the merged Arduino output (single app binary)
 MERGED_FILENAME = "Joystick.ino.merged.bin"
 APP_ADDR = "0x10000"
 FW_MERGED_URL = f"https://github.com/Archer2121/ESP32-Joystick/raw/597c542eba42b7a166a790ff989ffe8bf63c3959/Joystick/build/Heltec-esp32.esp32.heltec_wifi_lora_32_V3/Joystick.ino.merged.bin"
+# the URL is pinned to a commit, so a complete download for that SHA never goes stale
+_sha = re.search(r"/raw/([0-9a-f]{40})/", FW_MERGED_URL)
+FW_SHA = _sha.group(1) if _sha else None
+# expected SHA-256 of the file at FW_MERGED_URL; update both together. When
+# None, a fresh download only has to pass _check_merged_image.
+FW_MERGED_SHA256 = None
+
+# images at least this big are fetched as DOWNLOAD_WORKERS parallel byte ranges
+DOWNLOAD_WORKERS = 4
+PARALLEL_MIN_BYTES = 256 * 1024
+
+# esptool progress lines, e.g. "Writing at 0x00010000... (42 %)"
+ESPTOOL_PCT = re.compile(r"\((\d+)\s*%\)")
 
 # adjust if your module has different flash size
 FLASH_SIZE_BYTES = 8 * 1024 * 1024
 
+# minimum seconds between two progress bar updates from a running step
+PROGRESS_INTERVAL = 0.033
+
+# the serial monitor keeps at most this many lines
+LOG_MAX_LINES = 5000
+
+# USB VID:PID of the bridges ESP32 boards use: Silabs CP210x, WCH CH340,
+# FTDI FT232R, Espressif USB-Serial/JTAG and Espressif USB-OTG CDC
+KNOWN_VIDPID = {(0x10C4, 0xEA60), (0x1A86, 0x7523), (0x0403, 0x6001),
+                (0x303A, 0x1001), (0x303A, 0x0002)}
+
+# comports() results are reused for this many seconds
+PORTS_CACHE_TTL = 1.0
+_ports_cache = {"t": 0.0, "v": []}
+
 BASE = os.path.dirname(os.path.abspath(__file__))
 FW_DIR = os.path.join(BASE, "firmware")
 os.makedirs(FW_DIR, exist_ok=True)
 
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _check_merged_image(path):
+    # a merged image is padded to the whole flash and starts with the
+    # bootloader (magic 0xE9), with the partition table (AA 50) at 0x8000 and
+    # the app image at APP_ADDR; a truncated body or an HTML page fails this
+    if os.path.getsize(path) != FLASH_SIZE_BYTES:
+        return False
+    with open(path, "rb") as f:
+        boot = f.read(1)
+        f.seek(0x8000)
+        pt = f.read(2)
+        f.seek(int(APP_ADDR, 16))
+        app = f.read(1)
+    return boot == b"\xe9" and pt == b"\xaa\x50" and app == b"\xe9"
+
+def _list_ports():
+    # comports() is a WMI query on Windows and a sysfs walk on Linux
+    now = time.monotonic()
+    if _ports_cache["t"] and now - _ports_cache["t"] < PORTS_CACHE_TTL:
+        return list(_ports_cache["v"])
+    ports = list(serial.tools.list_ports.comports())
+    _ports_cache.update(t=now, v=ports)
+    return list(ports)
+
+class EsptoolOutput:
+    """File-like sink for esptool output: logs it and tracks flash progress."""
+    def __init__(self, app):
+        self.app = app
+        self.buf = ""
+        self.writing = False
+
+    def write(self, s):
+        # esptool redraws progress with \r when it thinks it has a terminal
+        self.buf += s.replace("\r", "\n")
+        *lines, self.buf = self.buf.split("\n")
+        for line in lines:
+            if line:
+                self.line(line + "\n")
+        return len(s)
+
+    def flush(self):
+        if self.buf:
+            self.line(self.buf + "\n")
+            self.buf = ""
+
+    def isatty(self):
+        return False
+
+    def line(self, line):
+        app = self.app
+        app.log(line)
+        # write progress fills the 50-100 band left after the download
+        m = ESPTOOL_PCT.search(line)
+        if m and line.startswith("Writing"):
+            if not self.writing:
+                self.writing = True
+                app.after(0, app.status.set, "Writing flash...")
+            app.set_progress(50 + int(m.group(1)) // 2)
+        elif line.startswith("Erasing flash"):
+            app.after(0, app.status.set, "Erasing flash...")
+        elif line.startswith("Hash of data verified"):
+            app.after(0, app.status.set, "Verified, resetting device...")
+
 class FirmwareUpdater(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -28,6 +135,7 @@ class FirmwareUpdater(tk.Tk):
 
         self.port = tk.StringVar()
         self.progress = tk.IntVar()
+        self._last_progress = 0.0
         self.status = tk.StringVar(value="Idle")
 
         ttk.Label(self, text="COM Port").pack()
@@ -45,33 +153,79 @@ class FirmwareUpdater(tk.Tk):
         self.serial_box.pack(fill="both", expand=True, padx=10)
 
         self.ser = None
+        # log() may be called from any thread; _drain_log inserts on the Tk thread
+        self._log_q = deque()
+        self._drain_log()
         self.refresh_ports()
 
     def refresh_ports(self):
-        ports = [p.device for p in serial.tools.list_ports.comports()]
+        infos = _list_ports()
+        ports = [p.device for p in infos]
         self.ports["values"] = ports
         if ports:
-            self.port.set(ports[0])
+            # default to a known ESP32 USB bridge rather than whatever sorts first
+            known = [p.device for p in infos if (p.vid, p.pid) in KNOWN_VIDPID]
+            self.port.set(known[0] if known else ports[0])
+
+    def set_progress(self, value):
+        # downloads report per chunk and esptool per block; ~30 bar updates a
+        # second are plenty, so intermediate values inside PROGRESS_INTERVAL are dropped
+        now = time.monotonic()
+        if now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.progress.set(value)
 
     def log(self, msg):
-        self.serial_box.insert(tk.END, msg)
-        self.serial_box.see(tk.END)
+        self._log_q.append(msg)
+
+    def _drain_log(self):
+        # everything logged since the last tick goes in with one insert/see
+        if self._log_q:
+            batch = []
+            while self._log_q:
+                batch.append(self._log_q.popleft())
+            self.serial_box.insert(tk.END, "".join(batch))
+            if int(self.serial_box.index("end-1c").split(".")[0]) > LOG_MAX_LINES:
+                self.serial_box.delete("1.0", f"end-{LOG_MAX_LINES}l")
+            self.serial_box.see(tk.END)
+        self.after(50, self._drain_log)
 
-    def start_serial(self):
+    def start_serial(self, wait=0.0):
+        # wait: keep retrying the open for up to this many seconds, for a port
+        # that is briefly unavailable while the board resets
         if self.ser:
             return
-        try:
-            self.ser = serial.Serial(self.port.get(), BAUD_SERIAL, timeout=0.1)
-            threading.Thread(target=self.read_serial, daemon=True).start()
-        except Exception as e:
-            self.log(f"[SERIAL ERROR] {e}\n")
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                self.ser = serial.Serial(self.port.get(), BAUD_SERIAL, timeout=0.1)
+                threading.Thread(target=self.read_serial, daemon=True).start()
+                return
+            except Exception as e:
+                if time.monotonic() >= deadline:
+                    self.log(f"[SERIAL ERROR] {e}\n")
+                    return
+                time.sleep(0.1)
 
     def read_serial(self):
+        # one decoder for the stream, so UTF-8 sequences split across reads survive
+        dec = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        posix = os.name == "posix"
         while self.ser:
             try:
-                line = self.ser.readline().decode(errors="ignore")
-                if line:
-                    self.log(line)
+                ser = self.ser
+                if posix:
+                    # sleep in select() until bytes arrive instead of waking on
+                    # every readline() timeout, then take whatever is buffered
+                    ready, _, _ = select.select([ser.fileno()], [], [], 1.0)
+                    if not ready:
+                        continue
+                data = ser.read(ser.in_waiting or 1)
+                if data:
+                    text = dec.decode(data)
+                    if text:
+                        self.log(text)
             except:
                 break
 
@@ -87,14 +241,16 @@ class FirmwareUpdater(tk.Tk):
 
     def enter_flash_mode(self):
         try:
-            if self.ser:
-                try:
-                    self.ser.close()
-                except:
-                    pass
-                self.ser = None
-
-            s = serial.Serial(self.port.get(), BAUD_SERIAL, timeout=0.1)
+            # reuse the monitor's handle when it is on the same port: another
+            # open can cost hundreds of ms while the USB-CDC device settles
+            s, self.ser = self.ser, None
+            if not (s and s.is_open and s.port == self.port.get()):
+                if s:
+                    try:
+                        s.close()
+                    except:
+                        pass
+                s = serial.Serial(self.port.get(), BAUD_SERIAL, timeout=0.1)
             # Toggle DTR/RTS sequence to try to force ESP32 into bootloader
             s.setDTR(False)
             s.setRTS(True)
@@ -107,6 +263,148 @@ class FirmwareUpdater(tk.Tk):
         except Exception as e:
             self.log(f"[BOOT MODE ERROR] {e}\n")
 
+    def download_merged(self, merged_path):
+        # imported here: requests is slow to load and only needed for downloads
+        import requests
+        # merged_path.meta remembers the ETag and full size of the last
+        # download: a complete file is revalidated, a partial one resumed
+        meta_path = merged_path + ".meta"
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except Exception:
+            meta = {}
+        have = os.path.getsize(merged_path) if os.path.exists(merged_path) else 0
+        if meta.get("complete") and have and have == meta.get("size"):
+            if meta.get("sha256") and _sha256_file(merged_path) != meta["sha256"]:
+                # the cached copy was damaged on disk: start over
+                self.log("[INFO] Cached merged binary is corrupt, downloading again.\n")
+                meta, have = {}, 0
+            elif FW_SHA:
+                self.log(f"[INFO] Using cached merged binary for {FW_SHA[:7]}.\n")
+                return
+        # byte ranges only line up with the file on disk without transfer encoding
+        headers = {"Accept-Encoding": "identity"}
+        etag = meta.get("etag")
+        if etag and have:
+            if meta.get("complete") and have == meta.get("size"):
+                headers["If-None-Match"] = etag
+            elif have < meta.get("size", 0):
+                headers["Range"] = f"bytes={have}-"
+                headers["If-Range"] = etag
+
+        if len(headers) == 1:
+            # nothing to reuse: fetch in parallel ranges when the server allows it
+            h = requests.head(FW_MERGED_URL, headers=headers, allow_redirects=True, timeout=30)
+            total = int(h.headers.get("content-length", 0))
+            if (h.status_code == 200 and h.headers.get("accept-ranges") == "bytes"
+                    and total >= PARALLEL_MIN_BYTES):
+                with open(meta_path, "w") as f:
+                    json.dump({"etag": h.headers.get("etag"), "size": total}, f)
+                self.download_ranges(h.url, merged_path, total)
+                self.finish_download(merged_path, meta_path, h.headers.get("etag"), total)
+                return
+
+        # stream to disk so the image is never held in memory whole
+        with requests.get(FW_MERGED_URL, headers=headers, stream=True, timeout=30) as r:
+            if r.status_code == 304:
+                self.log("[INFO] Cached merged binary is up to date.\n")
+                return
+            if r.status_code == 206:
+                mode, done = "ab", have
+                total = int(r.headers.get("content-range", "/0").rsplit("/", 1)[-1] or 0)
+                self.log(f"[INFO] Resuming download at {have} bytes.\n")
+            elif r.status_code == 200:
+                mode, done = "wb", 0
+                total = int(r.headers.get("content-length", 0))
+            else:
+                raise RuntimeError(f"Failed to download {MERGED_FILENAME}")
+            # written up front so an interrupted download can be resumed
+            with open(meta_path, "w") as f:
+                json.dump({"etag": r.headers.get("etag"), "size": total}, f)
+            with open(merged_path, mode) as w:
+                for chunk in r.iter_content(chunk_size=65536):
+                    w.write(chunk)
+                    done += len(chunk)
+                    if total:
+                        self.set_progress(done * 50 // total)
+        if total and done != total:
+            raise RuntimeError(f"Incomplete download of {MERGED_FILENAME} ({done}/{total} bytes)")
+        self.finish_download(merged_path, meta_path, r.headers.get("etag"), total)
+
+    def finish_download(self, merged_path, meta_path, etag, total):
+        # hash the assembled file once, whichever way it was fetched, so a
+        # truncated or substituted download (e.g. a captive portal page) never
+        # reaches esptool
+        digest = _sha256_file(merged_path)
+        if FW_MERGED_SHA256 and digest != FW_MERGED_SHA256:
+            error = f"Checksum mismatch for {MERGED_FILENAME}: got {digest}"
+        elif not _check_merged_image(merged_path):
+            error = f"{MERGED_FILENAME} is not a merged ESP32 image"
+        else:
+            error = None
+        if error:
+            for path in (merged_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            raise RuntimeError(error)
+        with open(meta_path, "w") as f:
+            json.dump({"etag": etag, "size": total, "complete": True, "sha256": digest}, f)
+
+    def download_ranges(self, url, path, total):
+        import requests
+        # each worker streams one byte range into its slice of a preallocated file
+        with open(path, "wb") as f:
+            f.truncate(total)
+        step = -(-total // DOWNLOAD_WORKERS)
+        lock = threading.Lock()
+        done = [0]
+
+        def fetch(start):
+            end = min(start + step, total) - 1
+            headers = {"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"}
+            with requests.get(url, headers=headers, stream=True, timeout=30) as r:
+                if r.status_code != 206:
+                    raise RuntimeError(f"Failed to download {MERGED_FILENAME} (HTTP {r.status_code})")
+                with open(path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in r.iter_content(chunk_size=65536):
+                        f.write(chunk)
+                        with lock:
+                            done[0] += len(chunk)
+                            n = done[0]
+                        self.set_progress(n * 50 // total)
+
+        with ThreadPoolExecutor(DOWNLOAD_WORKERS) as ex:
+            list(ex.map(fetch, range(0, total, step)))
+        if done[0] != total:
+            raise RuntimeError(f"Incomplete download of {MERGED_FILENAME} ({done[0]}/{total} bytes)")
+
+    def run_esptool(self, cmd):
+        # like subprocess.run(check=True), but esptool's output shows up live in the log
+        out = EsptoolOutput(self)
+        if esptool is not None:
+            # same interpreter: no process start or re-import of esptool/pyserial
+            try:
+                with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                    esptool.main(cmd[1:])
+            except SystemExit as e:
+                if e.code:
+                    raise subprocess.CalledProcessError(e.code, cmd)
+            finally:
+                out.flush()
+            return
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             text=True, bufsize=1)
+        for line in p.stdout:
+            out.line(line)
+        p.stdout.close()
+        rc = p.wait()
+        if rc:
+            raise subprocess.CalledProcessError(rc, cmd)
+
     def update(self, local_bin=None):
         try:
             self.progress.set(0)
@@ -117,15 +415,16 @@ class FirmwareUpdater(tk.Tk):
 
             merged_path = None
             if not local_bin:
-                r = requests.get(FW_MERGED_URL, timeout=30)
-                if r.status_code != 200:
-                    raise RuntimeError(f"Failed to download {MERGED_FILENAME}")
-                merged_path = os.path.join(FW_DIR, MERGED_FILENAME)
-                with open(merged_path, "wb") as w:
-                    w.write(r.content)
+                name = f"{FW_SHA}_{MERGED_FILENAME}" if FW_SHA else MERGED_FILENAME
+                merged_path = os.path.join(FW_DIR, name)
+                self.download_merged(merged_path)
                 self.progress.set(50)
             else:
-                merged_path = local_bin
+                # flash a snapshot in FW_DIR so the source can't change underneath
+                # esptool; copyfile() keeps the copy in the kernel where it can
+                merged_path = os.path.join(FW_DIR, "local_" + MERGED_FILENAME)
+                if os.path.abspath(local_bin) != merged_path:
+                    shutil.copyfile(local_bin, merged_path)
                 self.progress.set(50)
 
             file_size = os.path.getsize(merged_path)
@@ -138,21 +437,24 @@ class FirmwareUpdater(tk.Tk):
             self.status.set("Entering flash mode...")
             self.enter_flash_mode()
 
-            self.status.set("Erasing flash...")
-            subprocess.run(
-                ["esptool", "--chip", CHIP, "--port", self.port.get(), "erase-flash"],
-                check=True
-            )
-
+            # one esptool run erases the whole chip and writes the image, so the
+            # process start, port open and stub upload are only paid once
             self.status.set(f"Flashing merged binary at {flash_addr}...")
             cmd = ["esptool", "--chip", CHIP, "--port", self.port.get(),
-                   "--baud", BAUD_FLASH, "write-flash", flash_addr, merged_path]
-            subprocess.run(cmd, check=True)
+                   "--baud", BAUD_FLASH, "write-flash", "--erase-all", "-z", flash_addr, merged_path]
+            try:
+                self.run_esptool(cmd)
+            except Exception:
+                self.log(f"[INFO] Flashing at {BAUD_FLASH} baud failed, retrying at {BAUD_FLASH_FALLBACK}.\n")
+                self.progress.set(50)
+                cmd[cmd.index("--baud") + 1] = BAUD_FLASH_FALLBACK
+                self.run_esptool(cmd)
 
             self.progress.set(100)
             self.status.set("Update complete ✔")
-            time.sleep(2)
-            self.start_serial()
+            # esptool has already reset the board; attach as soon as the port
+            # opens so the boot output is captured too
+            self.start_serial(wait=2.0)
 
         except Exception as e:
             self.progress.set(0)
@@ -8,6 +8,10 @@ Requires: pyserial, requests
 """
 
 import os
+import json
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 import threading
 import subprocess
 import requests
@@ -15,14 +19,23 @@ import serial
 import serial.tools.list_ports
 import time
 import queue
+from collections import deque
 import re
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 
+# run esptool in-process when it is importable; otherwise spawn the CLI
+try:
+    import esptool
+except ImportError:
+    esptool = None
+
 # Firmware constants (from flash-joystick.py)
 CHIP = "auto"
-BAUD_FLASH = "921600"
+BAUD_FLASH = "1500000"
+# not every USB-UART bridge or cable holds 1.5 Mbit; step down on failure
+BAUD_FLASH_FALLBACKS = ("921600", "460800")
 BAUD_SERIAL = 115200
 MERGED_FILENAME = "Joystick.ino.merged.bin"
 APP_ADDR = "0x10000"
@@ -31,8 +44,146 @@ FLASH_SIZE_BYTES = 8 * 1024 * 1024
 BASE = os.path.dirname(os.path.abspath(__file__))
 FW_DIR = os.path.join(BASE, "firmware")
 os.makedirs(FW_DIR, exist_ok=True)
+# downloads are cached per pinned commit, never over the firmware/ file the
+# repo ships (which a user may pick as a local image)
+_sha = re.search(r"/raw/([0-9a-f]{40})/", FW_MERGED_URL)
+FW_SHA = _sha.group(1) if _sha else None
+FW_CACHE_PATH = os.path.join(FW_DIR, f"{FW_SHA}_{MERGED_FILENAME}" if FW_SHA else f"download_{MERGED_FILENAME}")
 
 READ_TIMEOUT = 0.1
+# most bytes taken from the driver per read while assembling lines
+READ_CHUNK = 2048
+
+# serial monitors keep at most this many lines
+LOG_MAX_LINES = 5000
+# calibrator lines buffered between ticks before the oldest are dropped
+Q_MAX_LINES = 4096
+
+# esptool lines worth reacting to, matched in one pass per line:
+#   pct:  "Writing at 0x00010000... (42 %)" (v4) or "... [===>  ] 42.1% ..." (v5)
+#   err:  "A fatal error occurred: ..."
+#   ok:   "Hash of data verified."
+#   conn: "Connecting...."
+_ESPTOOL_RE = re.compile(r'Writing at .*?(?P<pct>\d{1,3})(?:\.\d+)?\s?%'
+                         r'|(?P<err>A fatal error occurred:.*)'
+                         r'|(?P<ok>Hash of data verified)'
+                         r'|(?P<conn>Connecting\.)')
+
+# firmware answers the 'version' command with e.g. "FW_VERSION:1.0.0"
+_FW_VERSION_RE = re.compile(rb'FW_VERSION\s*[:=]?\s*([0-9]+\.[0-9]+\.[0-9]+)')
+
+
+# comports() results are reused for this many seconds, across all tabs
+PORTS_CACHE_TTL = 1.0
+_ports_cache = {'t': 0.0, 'v': []}
+
+
+def _list_ports():
+    """Device names of the available serial ports, cached for PORTS_CACHE_TTL."""
+    now = time.monotonic()
+    if _ports_cache['t'] and now - _ports_cache['t'] < PORTS_CACHE_TTL:
+        return list(_ports_cache['v'])
+    ports = [p.device for p in serial.tools.list_ports.comports()]
+    _ports_cache['v'] = ports
+    _ports_cache['t'] = now
+    return list(ports)
+
+
+# one lock per port name, shared by every path that opens, closes or writes it
+_PORT_LOCKS = {}
+_PORT_LOCKS_GUARD = threading.Lock()
+# ports esptool currently owns; only changed under the port's lock, so
+# SerialManager.connect/write see it before touching the port
+_FLASHING_PORTS = set()
+
+
+def _lock_for(port):
+    with _PORT_LOCKS_GUARD:
+        lock = _PORT_LOCKS.get(port)
+        if lock is None:
+            lock = _PORT_LOCKS[port] = threading.Lock()
+        return lock
+
+
+@contextlib.contextmanager
+def _hold_for_flash(port):
+    # keep every SerialManager off the port for the whole
+    # disconnect -> esptool window, not just while the lock is held
+    with _lock_for(port):
+        _FLASHING_PORTS.add(port)
+    try:
+        yield
+    finally:
+        with _lock_for(port):
+            _FLASHING_PORTS.discard(port)
+
+
+def _check_image(path, flash_addr):
+    # refuse a file that can't be ESP32 firmware before anything is erased:
+    # every image segment starts with magic 0xE9, and a merged image written
+    # at 0x0 also carries the partition table (magic AA 50) at 0x8000 and the
+    # app image at APP_ADDR
+    with open(path, 'rb') as f:
+        head = f.read(1)
+        if head != b'\xe9':
+            raise RuntimeError(f"{os.path.basename(path)} is not an ESP32 firmware image")
+        if int(flash_addr, 16) == 0:
+            f.seek(0x8000)
+            pt = f.read(2)
+            f.seek(int(APP_ADDR, 16))
+            app = f.read(1)
+            if pt != b'\xaa\x50' or app != b'\xe9':
+                raise RuntimeError(f"{os.path.basename(path)} is not a merged image (no partition table/app at the usual offsets)")
+
+
+def _set_low_latency(ser):
+    # FTDI/CH34x adapters hold small packets for up to 16 ms unless the
+    # driver is in low-latency mode; pyserial only exposes that on Linux,
+    # and CDC-ACM ports (the S3's native USB) reject it, which is harmless
+    try:
+        ser.set_low_latency_mode(True)
+    except Exception:
+        pass
+
+
+def _append_log(widget, text):
+    # insert, then drop the oldest lines so long sessions stay cheap to render
+    widget.insert('end', text)
+    if int(widget.index('end-1c').split('.')[0]) > LOG_MAX_LINES:
+        widget.delete('1.0', f'end-{LOG_MAX_LINES}l')
+    widget.see('end')
+
+
+class LineReader:
+    """readline() over a pyserial port without one syscall per byte.
+
+    Reads whatever the driver has buffered (up to READ_CHUNK) and slices lines
+    out of a local buffer. A partial line is kept until its newline arrives;
+    on a read timeout readline() returns b''. Lines are only cut after b'\n',
+    which never occurs inside a UTF-8 sequence, so decoding each line on its
+    own is safe without an incremental decoder.
+    """
+    def __init__(self, ser):
+        self.ser = ser
+        self.buf = bytearray()
+
+    def readline(self):
+        i = self.buf.find(b'\n')
+        if i >= 0:
+            line = bytes(self.buf[:i + 1])
+            del self.buf[:i + 1]
+            return line
+        while True:
+            # the first read(1) still blocks for up to the port timeout
+            data = self.ser.read(max(1, min(READ_CHUNK, self.ser.in_waiting)))
+            if not data:
+                return b''
+            i = data.find(b'\n')
+            if i >= 0:
+                line = bytes(self.buf) + data[:i + 1]
+                self.buf[:] = data[i + 1:]
+                return line
+            self.buf += data
 
 
 class SerialManager:
@@ -40,74 +191,104 @@ class SerialManager:
         self.serial = None
         self.read_thread = None
         self.alive = threading.Event()
-        self.listeners = []
+        # copy-on-write: replaced (never mutated) under the lock, read without it
+        self.listeners = ()
         self.lock = threading.Lock()
 
     def add_listener(self, cb):
         try:
             with self.lock:
-                self.listeners.append(cb)
+                # registering twice would deliver every line twice
+                if cb not in self.listeners:
+                    self.listeners = self.listeners + (cb,)
         except Exception:
             pass
 
     def remove_listener(self, cb):
         try:
             with self.lock:
-                if cb in self.listeners:
-                    self.listeners.remove(cb)
+                self.listeners = tuple(x for x in self.listeners if x != cb)
         except Exception:
             pass
 
     def connect(self, port, baud=BAUD_SERIAL, timeout=READ_TIMEOUT):
-        if self.serial and self.serial.is_open:
-            return
-        self.serial = serial.Serial(port, baud, timeout=timeout)
-        self.alive.set()
-        self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
-        self.read_thread.start()
+        lock = _lock_for(port)
+        # don't wait out another thread's open/close from the Tk thread
+        if not lock.acquire(timeout=0.5):
+            raise RuntimeError(f"{port} is busy")
+        try:
+            if port in _FLASHING_PORTS:
+                raise RuntimeError(f"{port} is busy (firmware update in progress)")
+            if self.serial and self.serial.is_open:
+                return
+            self.serial = serial.Serial(port, baud, timeout=timeout)
+            _set_low_latency(self.serial)
+            self.alive.set()
+            self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
+            self.read_thread.start()
+        finally:
+            lock.release()
 
     def disconnect(self):
-        self.alive.clear()
+        port = self.get_port()
+        lock = _lock_for(port) if port else None
+        if lock:
+            lock.acquire()
         try:
-            if self.read_thread:
-                self.read_thread.join(timeout=0.5)
-        except Exception:
-            pass
-        try:
-            if self.serial and self.serial.is_open:
-                self.serial.close()
-        except Exception:
-            pass
-        self.serial = None
+            self.alive.clear()
+            try:
+                if self.read_thread:
+                    self.read_thread.join(timeout=0.5)
+            except Exception:
+                pass
+            try:
+                if self.serial and self.serial.is_open:
+                    self.serial.close()
+            except Exception:
+                pass
+            self.serial = None
+        finally:
+            if lock:
+                lock.release()
 
     def _read_loop(self):
+        # listeners get raw bytes lines and decode only what they display
+        reader = LineReader(self.serial)
         while self.alive.is_set() and self.serial and self.serial.is_open:
             try:
-                line = self.serial.readline().decode(errors='replace')
+                line = reader.readline()
                 if line:
-                    with self.lock:
-                        for cb in list(self.listeners):
-                            try:
-                                cb(line)
-                            except Exception:
-                                pass
-                else:
-                    time.sleep(0.01)
-            except Exception as e:
-                with self.lock:
-                    for cb in list(self.listeners):
+                    for cb in self.listeners:
                         try:
-                            cb(f"<ERROR reading serial: {e}>\n")
+                            cb(line)
                         except Exception:
                             pass
+            except Exception as e:
+                for cb in self.listeners:
+                    try:
+                        cb(f"<ERROR reading serial: {e}>\n".encode())
+                    except Exception:
+                        pass
                 break
 
     def write(self, data: bytes):
+        port = self.get_port()
+        if not port:
+            return
+        lock = _lock_for(port)
+        # a port being opened, closed or flashed drops writes rather than
+        # blocking the caller
+        if not lock.acquire(blocking=False):
+            return
         try:
+            if port in _FLASHING_PORTS:
+                return
             if self.serial and self.serial.is_open:
                 self.serial.write(data)
         except Exception:
             pass
+        finally:
+            lock.release()
 
     @property
     def is_open(self):
@@ -119,14 +300,66 @@ class SerialManager:
         except Exception:
             return None
 
+class _EsptoolSink:
+    """File-like stdout for in-process esptool: one callback per output line.
+
+    Raises from write() once cancelled() is true, which unwinds esptool at
+    its next progress line the way terminate() stops the CLI.
+    """
+    def __init__(self, on_line, cancelled):
+        self.on_line = on_line
+        self.cancelled = cancelled
+        self.buf = ''
+
+    def write(self, s):
+        if self.cancelled():
+            raise RuntimeError("Cancelled by user")
+        # esptool redraws progress with \r when it thinks it has a terminal
+        self.buf += s.replace('\r', '\n')
+        *lines, self.buf = self.buf.split('\n')
+        for line in lines:
+            if line:
+                self.on_line(line + '\n')
+        return len(s)
+
+    def flush(self):
+        if self.buf:
+            self.on_line(self.buf + '\n')
+            self.buf = ''
+
+    def isatty(self):
+        return False
+
+
 class UpdaterTab(ttk.Frame):
-    def __init__(self, master, port_var=None, serial_manager=None):
+    def __init__(self, master, port_var=None, serial_manager=None, loop=None):
         super().__init__(master)
         self.port = port_var or tk.StringVar()
-        self.serial_manager = serial_manager
+        # all serial I/O goes through a SerialManager (the app's shared one)
+        self.serial_manager = serial_manager or SerialManager()
+        # asyncio loop (running on its own thread) that update() is scheduled on
+        self.loop = loop
         self.progress = tk.IntVar()
         self.status = tk.StringVar(value="Idle")
+        # running esptool process (CLI fallback), so Cancel can stop it
+        self._flash_proc = None
+        self._flashing = False
+        self._cancel_requested = False
+        # set on the Tk thread while an update() is scheduled or running, so a
+        # second click can't start another flash on the same port
+        self._updating = False
+        # latest progress value from any thread, and the one on the bar;
+        # _drain_ui copies the first into the second (see _set_progress)
+        self._pending_progress = None
+        self._shown_progress = None
+        # GitHub binary fetch, started when Update is clicked (see _prefetch_fw);
+        # it only drives the bar once update() knows it is the source
+        self._fw_pool = ThreadPoolExecutor(max_workers=1)
+        self._download_progress = False
+        # text for the serial monitor, queued from any thread and inserted by _drain_ui
+        self._ui_queue = queue.Queue()
         self._build()
+        self._drain_ui()
         self.refresh_ports()
 
     def _build(self):
@@ -135,7 +368,9 @@ class UpdaterTab(ttk.Frame):
         self.ports.grid(row=0, column=1, sticky='w')
         ttk.Button(self, text="Refresh Ports", command=self.refresh_ports).grid(row=0, column=2, padx=6)
         ttk.Button(self, text="Settings", command=self._open_settings).grid(row=0, column=3, padx=6)
-        ttk.Button(self, text="Update Firmware (merged)", command=self.start_update).grid(row=1, column=0, columnspan=3, pady=6)
+        self.update_btn = ttk.Button(self, text="Update Firmware (merged)", command=self.start_update)
+        self.update_btn.grid(row=1, column=0, columnspan=3, pady=6)
+        ttk.Button(self, text="Cancel", command=self.cancel_update).grid(row=1, column=3, padx=6)
 
         self.pbar = ttk.Progressbar(self, maximum=100, variable=self.progress)
         self.pbar.grid(row=2, column=0, columnspan=3, sticky='we', padx=6)
@@ -147,33 +382,47 @@ class UpdaterTab(ttk.Frame):
         self.grid_rowconfigure(5, weight=1)
 
     def refresh_ports(self):
-        ports = [p.device for p in serial.tools.list_ports.comports()]
+        ports = _list_ports()
         self.ports['values'] = ports
         if ports:
             self.port.set(ports[0])
 
     def log(self, msg):
+        # safe from the reader and update threads: Tk is only touched in _drain_ui
+        self._ui_queue.put(msg)
+
+    def _ui(self, fn, *args):
+        # update() runs off the Tk thread; hand widget/variable calls to Tk
+        self.after(0, fn, *args)
+
+    def _set_progress(self, value):
+        # any thread: only record the value; _drain_ui puts the latest one on
+        # the bar, so bursts (download chunks, esptool lines) cost one redraw
+        # per tick and nothing here touches Tk
+        self._pending_progress = value
+
+    def _flush_progress(self):
+        v = self._pending_progress
+        if v is not None and v != self._shown_progress:
+            self._shown_progress = v
+            self.progress.set(v)
+
+    def _drain_ui(self):
+        parts = []
         try:
-            self.serial_box.insert(tk.END, msg)
-            self.serial_box.see(tk.END)
-        except Exception:
+            while True:
+                parts.append(self._ui_queue.get_nowait())
+        except queue.Empty:
             pass
+        if parts:
+            try:
+                _append_log(self.serial_box, ''.join(parts))
+            except Exception:
+                pass
+        self._flush_progress()
+        self.after(50, self._drain_ui)
 
     def start_serial(self):
-        if not self.serial_manager:
-            # fallback to internal serial if no manager
-            try:
-                if getattr(self, 'ser', None):
-                    return
-                self.ser = serial.Serial(self.port.get(), BAUD_SERIAL, timeout=0.1)
-                threading.Thread(target=self.read_serial, daemon=True).start()
-            except Exception as e:
-                self.log(f"[SERIAL ERROR] {e}\n")
-                try:
-                    messagebox.showwarning('Serial Open Failed', f"Unable to open {self.port.get()} for serial monitor:\n{e}\n\nClose other apps using the port and try again.")
-                except Exception:
-                    pass
-            return
         try:
             # attach a logger callback and connect via manager
             self.serial_manager.add_listener(self._manager_log_cb)
@@ -193,84 +442,244 @@ class UpdaterTab(ttk.Frame):
         except Exception:
             pass
 
-    def read_serial(self):
-        while getattr(self, 'ser', None):
-            try:
-                line = self.ser.readline().decode(errors='ignore')
-                if line:
-                    self.log(line)
-            except Exception:
-                break
-
-    def _manager_log_cb(self, text):
-        self.log(text)
+    def _manager_log_cb(self, line):
+        self.log(line.decode(errors='replace'))
 
     def start_update(self):
+        if self._updating:
+            return
+        # fetch while the user is still answering the prompts; it only ever
+        # writes the SHA-keyed FW_CACHE_PATH, and if they pick a local file
+        # (or cancel) the download just lands in the cache for next time
+        self._download_progress = False
+        fw = self._prefetch_fw()
         resp = messagebox.askquestion("Update Source", "Update from a local merged .bin file?\nYes = local file, No = GitHub merged binary")
         if resp == 'yes':
             path = filedialog.askopenfilename(title="Select merged .bin file", filetypes=[("Binary files","*.bin"),("All files","*.*")])
             if not path:
                 return
-            threading.Thread(target=self.update, args=(path,), daemon=True).start()
+            self._begin_update(self.update(path, fw=fw))
         else:
-            threading.Thread(target=self.update, daemon=True).start()
-
-    def enter_flash_mode(self):
-        try:
-            if getattr(self, 'ser', None):
+            self._begin_update(self.update(fw=fw))
+
+    def _begin_update(self, coro):
+        self._updating = True
+        self.update_btn.state(['disabled'])
+        self._schedule(coro)
+
+    def _end_update(self):
+        self._updating = False
+        self.update_btn.state(['!disabled'])
+
+    def _prefetch_fw(self):
+        fut = self._fw_pool.submit(self.download_merged, FW_CACHE_PATH)
+        fut.add_done_callback(self._prefetch_done)
+        return fut
+
+    def _prefetch_done(self, fut):
+        # a prefetch nobody awaits (local file picked, dialog cancelled) would
+        # otherwise fail silently
+        if not fut.cancelled() and fut.exception() is not None:
+            self.log(f"[INFO] Background firmware download failed: {fut.exception()}\n")
+
+    def _schedule(self, coro):
+        if self.loop:
+            asyncio.run_coroutine_threadsafe(coro, self.loop)
+        else:
+            # standalone tab without the app's loop
+            threading.Thread(target=asyncio.run, args=(coro,), daemon=True).start()
+
+    def download_merged(self, merged_path):
+        # stream into a .part file; a leftover one from an interrupted run is
+        # resumed with Range + If-Range, and only if .part.meta says it came
+        # from this URL, so a changed image restarts instead of being spliced
+        part_path = merged_path + '.part'
+        part_meta_path = part_path + '.meta'
+        meta_path = merged_path + '.meta'
+        have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        # identity encoding: Content-Length, Range offsets and the bytes we
+        # write are then all the file itself, never a gzip stream
+        headers = {'Accept-Encoding': 'identity'}
+        if have:
+            try:
+                with open(part_meta_path, 'r', encoding='utf-8') as f:
+                    part_meta = json.load(f)
+            except Exception:
+                part_meta = {}
+            if part_meta.get('url') == FW_MERGED_URL and part_meta.get('etag'):
+                headers['Range'] = f'bytes={have}-'
+                headers['If-Range'] = part_meta['etag']
+            else:
+                have = 0
+        if not have and os.path.exists(merged_path):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except Exception:
+                meta = {}
+            # merged images are padded to the flash size, so a matching length
+            # alone proves nothing; it only counts for a file this tool
+            # downloaded from this same URL. If the HEAD fails, fall through
+            # to the conditional GET below
+            known = meta.get('url') == FW_MERGED_URL and meta.get('size') == os.path.getsize(merged_path)
+            if known:
                 try:
-                    self.ser.close()
+                    head = requests.head(FW_MERGED_URL, timeout=10, allow_redirects=True,
+                                         headers={'Accept-Encoding': 'identity'})
+                    remote_size = int(head.headers.get('Content-Length', 0) or 0)
+                    if head.ok and remote_size == meta['size']:
+                        self.log("[INFO] Cached merged binary matches the remote size.\n")
+                        return
                 except Exception:
                     pass
-                self.ser = None
-
-            s = serial.Serial(self.port.get(), BAUD_SERIAL, timeout=0.1)
-            s.setDTR(False)
-            s.setRTS(True)
-            time.sleep(0.05)
-            s.setDTR(True)
-            s.setRTS(False)
-            time.sleep(0.05)
-            s.close()
-            self.log("[INFO] Flash-mode sequence toggled.\n")
-        except Exception as e:
-            self.log(f"[BOOT MODE ERROR] {e}\n")
-
-    def update(self, local_bin=None):
-        try:
-            self.progress.set(0)
-            if local_bin:
-                self.status.set("Preparing local merged update...")
-            else:
-                self.status.set("Downloading merged binary...")
-
-            merged_path = None
-            if not local_bin:
-                r = requests.get(FW_MERGED_URL, timeout=30)
-                if r.status_code != 200:
-                    raise RuntimeError(f"Failed to download {MERGED_FILENAME}")
-                merged_path = os.path.join(FW_DIR, MERGED_FILENAME)
-                with open(merged_path, 'wb') as w:
-                    w.write(r.content)
-                self.progress.set(50)
+            # revalidate the previous download against the validators it came with
+            if known:
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+        r = requests.get(FW_MERGED_URL, headers=headers, stream=True, timeout=30)
+        if have and not r.ok:
+            # e.g. 416 for a .part that was complete but never renamed: drop
+            # it, or every later update would fail the same way
+            r.close()
+            for path in (part_path, part_meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.log("[INFO] Could not resume the download, starting over.\n")
+            have = 0
+            headers = {'Accept-Encoding': 'identity'}
+            r = requests.get(FW_MERGED_URL, headers=headers, stream=True, timeout=30)
+        with r:
+            if r.status_code == 304:
+                self.log("[INFO] Cached merged binary is up to date.\n")
+                return
+            if r.status_code == 206:
+                mode, done = 'ab', have
+                self.log(f"[INFO] Resuming download at {have} bytes.\n")
+            elif r.status_code == 200:
+                # fresh body (or If-Range saw a different image): start over
+                mode, done = 'wb', 0
             else:
-                merged_path = local_bin
-                self.progress.set(50)
+                raise RuntimeError(f"Failed to download {MERGED_FILENAME}")
+            total = done + int(r.headers.get('Content-Length', 0) or 0)
+            validators = {'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified')}
+            if mode == 'wb':
+                # recorded before any bytes land so an interrupted run can resume
+                try:
+                    with open(part_meta_path, 'w', encoding='utf-8') as f:
+                        json.dump({'url': FW_MERGED_URL, 'etag': validators['etag']}, f)
+                except Exception:
+                    pass
+            with open(part_path, mode) as w:
+                for chunk in r.iter_content(chunk_size=65536):
+                    w.write(chunk)
+                    done += len(chunk)
+                    if total and self._download_progress:
+                        self._set_progress(done * 50 // total)
+        if total and done != total:
+            raise RuntimeError(f"Incomplete download of {MERGED_FILENAME} ({done}/{total} bytes)")
+        os.replace(part_path, merged_path)
+        try:
+            os.remove(part_meta_path)
+        except OSError:
+            pass
+        try:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(validators, url=FW_MERGED_URL, size=done), f)
+        except Exception:
+            pass
 
-            file_size = os.path.getsize(merged_path)
-            default_offset = int(APP_ADDR, 16)
-            if file_size > FLASH_SIZE_BYTES - default_offset:
-                flash_addr = "0x0"
+    async def run_esptool(self, cmd):
+        # esptool's output goes to the monitor and drives the status line and
+        # the 50-100 band of the progress bar, instead of blocking in run()
+        state = {'fatal': None, 'writing': False}
+        on_line = lambda line: self._esptool_line(line, state)
+        self._flashing = True
+        try:
+            if esptool is not None:
+                rc = await asyncio.get_running_loop().run_in_executor(
+                    None, self._esptool_main, cmd[1:], on_line)
             else:
-                flash_addr = APP_ADDR
-
-            self.status.set("Entering flash mode...")
-            self.enter_flash_mode()
+                rc = await self._esptool_cli(cmd, on_line)
+        finally:
+            self._flashing = False
+        if self._cancel_requested:
+            raise RuntimeError("Cancelled by user")
+        if rc:
+            if state['fatal']:
+                raise RuntimeError(state['fatal'])
+            raise subprocess.CalledProcessError(rc, cmd)
+
+    def _esptool_main(self, argv, on_line):
+        # same interpreter: no process start or re-import of esptool/pyserial
+        out = _EsptoolSink(on_line, lambda: self._cancel_requested)
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                esptool.main(argv)
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else int(bool(e.code))
+        finally:
+            out.flush()
+        return 0
+
+    async def _esptool_cli(self, cmd, on_line):
+        p = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                 stderr=asyncio.subprocess.STDOUT)
+        self._flash_proc = p
+        try:
+            while True:
+                raw = await p.stdout.readline()
+                if not raw:
+                    break
+                on_line(raw.decode(errors='ignore'))
+            return await p.wait()
+        finally:
+            self._flash_proc = None
+
+    def _esptool_line(self, line, state):
+        self.log(line)
+        m = _ESPTOOL_RE.search(line)
+        if not m:
+            return
+        if m.lastgroup == 'pct':
+            if not state['writing']:
+                state['writing'] = True
+                self._ui(self.status.set, "Writing flash...")
+            self._set_progress(50 + int(m.group('pct')) // 2)
+        elif m.lastgroup == 'err':
+            state['fatal'] = m.group('err').strip()
+        elif m.lastgroup == 'ok':
+            self._set_progress(100)
+        elif m.lastgroup == 'conn':
+            self._ui(self.status.set, "Connecting to the ESP32...")
+
+    def cancel_update(self):
+        if not self._flashing:
+            return
+        # in-process esptool stops at its next output line (_EsptoolSink)
+        self._cancel_requested = True
+        p = self._flash_proc
+        if p and p.returncode is None:
+            try:
+                p.terminate()
+            except Exception:
+                pass
 
+    async def _flash(self, merged_path, flash_addr):
+        # release the monitor and erase+write with esptool; returns False
+        # (after reporting and reattaching the monitor) if esptool failed.
+        # The port stays marked as flashing from before the monitor is released
+        # until esptool is done, so no tab can reopen it in between
+        port = self.port.get()
+        reconnect_after = False
+        error = None
+        with _hold_for_flash(port):
             # If the shared SerialManager has the port open, close it before invoking esptool
-            reconnect_after = False
             try:
-                if self.serial_manager and self.serial_manager.is_open:
+                if self.serial_manager.is_open:
                     try:
                         # remove our listener so we don't get callback noise
                         try:
@@ -285,85 +694,154 @@ class UpdaterTab(ttk.Frame):
             except Exception:
                 pass
 
-            self.status.set("Erasing flash...")
-            try:
-                subprocess.run(["esptool", "--chip", CHIP, "--port", self.port.get(), "erase-flash"], check=True)
-            except Exception as e:
-                self.progress.set(0)
-                self.status.set("Error")
+            # one esptool session resets into the bootloader, erases and writes:
+            # no separate DTR/RTS open or erase-flash run with its own sync + stub
+            # upload. -z sends the image deflated, so the 16 KB stub write blocks
+            # carry several times more flash per ack.
+            bauds = (BAUD_FLASH,) + BAUD_FLASH_FALLBACKS
+            for baud in bauds:
+                self._ui(self.status.set, f"Erasing and flashing merged binary at {flash_addr} ({baud} baud)...")
+                cmd = ["esptool", "--chip", CHIP, "--port", port, "--baud", baud,
+                       "write-flash", "--erase-all", "-z", flash_addr, merged_path]
                 try:
-                    messagebox.showerror('Flash Error', f"Could not open {self.port.get()} or erase flash:\n{e}\n\nHint: ensure no other program is using the COM port and try again.")
-                except Exception:
-                    pass
-                # attempt to reconnect serial manager if we disconnected
-                if reconnect_after:
-                    try:
-                        self.serial_manager.connect(self.port.get())
-                        self.serial_manager.add_listener(self._manager_log_cb)
-                    except Exception:
-                        pass
-                return
-
-            self.status.set(f"Flashing merged binary at {flash_addr}...")
-            cmd = ["esptool", "--chip", CHIP, "--port", self.port.get(), "--baud", BAUD_FLASH, "write-flash", flash_addr, merged_path]
-            try:
-                subprocess.run(cmd, check=True)
-            except Exception as e:
-                self.progress.set(0)
-                self.status.set("Error")
+                    await self.run_esptool(cmd)
+                    error = None
+                    break
+                except Exception as e:
+                    error = e
+                    if self._cancel_requested:
+                        break
+                    if baud != bauds[-1]:
+                        self.log(f"[INFO] Flashing at {baud} baud failed, retrying slower.\n")
+        if error is not None:
+            self._set_progress(0)
+            if self._cancel_requested:
+                self._ui(self.status.set, "Cancelled")
+            else:
+                self._ui(self.status.set, "Error")
                 try:
-                    messagebox.showerror('Flash Error', f"Could not open {self.port.get()} or write flash:\n{e}\n\nHint: ensure no other program is using the COM port and try again.")
+                    self._ui(messagebox.showerror, 'Flash Error', f"Could not open {port} or write flash:\n{error}\n\nHint: ensure no other program is using the COM port and try again.")
                 except Exception:
                     pass
-                if reconnect_after:
-                    try:
-                        self.serial_manager.connect(self.port.get())
-                        self.serial_manager.add_listener(self._manager_log_cb)
-                    except Exception:
-                        pass
-                return
-
-            # Reconnect serial manager if we disconnected it earlier
+            # attempt to reconnect serial manager if we disconnected
             if reconnect_after:
                 try:
-                    self.log("[INFO] Reconnecting serial monitor...\n")
-                    self.serial_manager.connect(self.port.get())
+                    self.serial_manager.connect(port)
                     self.serial_manager.add_listener(self._manager_log_cb)
                 except Exception:
                     pass
+            return False
 
-            self.progress.set(100)
-            self.status.set("Update complete ✔")
-            time.sleep(2)
-            # start shared serial monitor if available
-            try:
-                if self.serial_manager:
+        # on success update() reattaches the monitor once the board has booted
+        return True
+
+    async def _wait_for_boot(self, timeout):
+        # reattach the monitor as soon as the port is back and wait for the
+        # firmware's READY line; older firmware only answers 'version' once up
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        def on_line(line):
+            if b'READY' in line or b'FW_VERSION' in line:
+                loop.call_soon_threadsafe(ready.set)
+
+        deadline = loop.time() + timeout
+        self.serial_manager.add_listener(on_line)
+        try:
+            while loop.time() < deadline:
+                try:
                     self.serial_manager.add_listener(self._manager_log_cb)
                     if not self.serial_manager.is_open:
                         self.serial_manager.connect(self.port.get())
-                else:
-                    self.start_serial()
-            except Exception:
-                pass
+                    self.serial_manager.write(b'version\n')
+                except Exception:
+                    pass
+                try:
+                    await asyncio.wait_for(ready.wait(), 0.5)
+                    return True
+                except asyncio.TimeoutError:
+                    pass
+            return False
+        finally:
+            self.serial_manager.remove_listener(on_line)
+
+    async def update(self, local_bin=None, fw=None):
+        # runs on the asyncio loop thread; the blocking download runs on
+        # _fw_pool (fw is the future start_update already submitted) so the
+        # loop stays free for esptool's output
+        self._cancel_requested = False
+        try:
+            self._set_progress(0)
+            if local_bin:
+                self._ui(self.status.set, "Preparing local merged update...")
+            else:
+                self._ui(self.status.set, "Downloading merged binary...")
+
+            merged_path = None
+            if not local_bin:
+                merged_path = FW_CACHE_PATH
+                self._download_progress = True
+                await asyncio.wrap_future(fw or self._prefetch_fw())
+                self._set_progress(50)
+            else:
+                merged_path = local_bin
+                if fw is not None and os.path.abspath(local_bin) == os.path.abspath(FW_CACHE_PATH):
+                    # the cache file itself was picked: let the prefetch finish
+                    # its os.replace before esptool opens it (errors are logged)
+                    try:
+                        await asyncio.wrap_future(fw)
+                    except Exception:
+                        pass
+                self._set_progress(50)
+
+            file_size = os.path.getsize(merged_path)
+            default_offset = int(APP_ADDR, 16)
+            if file_size > FLASH_SIZE_BYTES - default_offset:
+                flash_addr = "0x0"
+            else:
+                flash_addr = APP_ADDR
+            _check_image(merged_path, flash_addr)
+
+            if not await self._flash(merged_path, flash_addr):
+                return
+
+            self._set_progress(100)
+            # the single place the monitor is (re)attached after a good flash
+            self._ui(self.status.set, "Waiting for device boot...")
+            self.log("[INFO] Reconnecting serial monitor...\n")
+            if await self._wait_for_boot(5.0):
+                self._ui(self.status.set, "Update complete ✔")
+            else:
+                self.start_serial()
+                self._ui(self.status.set, "Update complete ✔ (device did not report ready)")
 
         except Exception as e:
-            self.progress.set(0)
-            self.status.set("Error")
-            messagebox.showerror("Error", str(e))
+            self._set_progress(0)
+            self._ui(self.status.set, "Error")
+            self._ui(messagebox.showerror, "Error", str(e))
+        finally:
+            self._ui(self._end_update)
 
 
 class CalibratorTab(ttk.Frame):
     def __init__(self, master, port_var=None, serial_manager=None):
         super().__init__(master)
         self.port_var = port_var or tk.StringVar()
-        self.serial_manager = serial_manager
-        self.serial = None
-        self.read_thread = None
-        self.alive = threading.Event()
-        self.q = queue.Queue()
+        # the manager owns the port and the reader thread; lines arrive via _on_serial_line
+        self.serial_manager = serial_manager or SerialManager()
+        # newest lines only: a hidden or stalled tab drops the oldest instead
+        # of piling up a 500 Hz stream; swapped out under _qlock each tick
+        self.q = deque(maxlen=Q_MAX_LINES)
+        self._qlock = threading.Lock()
+        # version reply spotted by the reader thread, so dropping lines can't
+        # lose it; the event tells the next tick to show it
+        self._version_seen = None
+        self._version_event = threading.Event()
         self.latest_version = self._load_latest_version()
         self.device_version = None
         self.awaiting_version = False
+        # monotonic time at which a pending version query gives up
+        self._version_deadline = 0.0
         self._build()
         self._poll_serial_queue()
         self.after(200, self._auto_connect)
@@ -435,7 +913,7 @@ class CalibratorTab(ttk.Frame):
 
     def refresh_ports(self):
         # keep behavior minimal: refresh available ports and set shared port if empty
-        ports = [p.device for p in serial.tools.list_ports.comports()]
+        ports = _list_ports()
         if ports and not self.port_var.get():
             try:
                 self.port_var.set(ports[0])
@@ -443,7 +921,7 @@ class CalibratorTab(ttk.Frame):
                 pass
 
     def _auto_connect(self):
-        vals = [p.device for p in serial.tools.list_ports.comports()]
+        vals = _list_ports()
         if vals and len(vals) > 0:
             try:
                 if not self.port_var.get():
@@ -454,9 +932,7 @@ class CalibratorTab(ttk.Frame):
 
     def toggle_connect(self):
         # kept for compatibility but not used; prefer single-action connect
-        if self.serial and self.serial.is_open:
-            return
-        else:
+        if not self.serial_manager.is_open:
             self.connect()
 
     def connect(self):
@@ -464,81 +940,42 @@ class CalibratorTab(ttk.Frame):
         if not port:
             messagebox.showwarning('No Port', 'Please select a COM port first.')
             return
-        # prefer shared serial manager when available
-        if hasattr(self, 'serial_manager') and self.serial_manager:
-            try:
-                self.serial_manager.add_listener(self._on_serial_line)
-                if not self.serial_manager.is_open:
-                    self.serial_manager.connect(port)
-                self.status_var.set(f'Connected: {port} @ {BAUD_SERIAL}')
-                try:
-                    # keep button as Connect (no disconnect action shown)
-                    self.connect_btn.config(text='Connect')
-                except Exception:
-                    pass
-                self.query_device_version()
-                return
-            except Exception as e:
-                messagebox.showerror('Connection Failed', str(e))
-                return
         try:
-            self.serial = serial.Serial(port, BAUD_SERIAL, timeout=READ_TIMEOUT)
+            self.serial_manager.add_listener(self._on_serial_line)
+            if not self.serial_manager.is_open:
+                self.serial_manager.connect(port)
         except Exception as e:
             messagebox.showerror('Connection Failed', str(e))
             return
-        self.alive.set()
-        self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
-        self.read_thread.start()
         self.status_var.set(f'Connected: {port} @ {BAUD_SERIAL}')
         try:
-            self.connect_btn.config(text='Disconnect')
+            # keep button as Connect (no disconnect action shown)
+            self.connect_btn.config(text='Connect')
         except Exception:
             pass
         self.query_device_version()
 
     def disconnect(self):
-        self.alive.clear()
-        # when using shared manager, just remove our listener
-        if hasattr(self, 'serial_manager') and self.serial_manager:
-            try:
-                self.serial_manager.remove_listener(self._on_serial_line)
-            except Exception:
-                pass
-            self.status_var.set('Disconnected')
-            try:
-                self.connect_btn.config(text='Connect')
-            except Exception:
-                pass
-            return
-        if self.read_thread:
-            self.read_thread.join(timeout=0.5)
+        # the port is shared, so just stop listening to it
         try:
-            if self.serial and self.serial.is_open:
-                self.serial.close()
+            self.serial_manager.remove_listener(self._on_serial_line)
         except Exception:
             pass
-        self.serial = None
         self.status_var.set('Disconnected')
         try:
             self.connect_btn.config(text='Connect')
         except Exception:
             pass
 
-    def _read_loop(self):
-        while self.alive.is_set() and self.serial and self.serial.is_open:
-            try:
-                line = self.serial.readline().decode(errors='replace')
-                if line:
-                    self.q.put(line)
-                else:
-                    time.sleep(0.01)
-            except Exception as e:
-                self.q.put(f"<ERROR reading serial: {e}>\n")
-                break
-
-    def _on_serial_line(self, text):
+    def _on_serial_line(self, line):
         try:
-            self.q.put(text)
+            if self.awaiting_version:
+                m = _FW_VERSION_RE.search(line)
+                if m:
+                    self._version_seen = m.group(1).decode()
+                    self._version_event.set()
+            with self._qlock:
+                self.q.append(line)
         except Exception:
             pass
 
@@ -547,61 +984,56 @@ class CalibratorTab(ttk.Frame):
 
     def detach_serial_manager(self):
         try:
-            if hasattr(self, 'serial_manager') and self.serial_manager:
-                self.serial_manager.remove_listener(self._on_serial_line)
+            self.serial_manager.remove_listener(self._on_serial_line)
         except Exception:
             pass
 
+    def _apply_version(self):
+        v = self._version_seen
+        if self.awaiting_version and v:
+            self._version_seen = None
+            self.device_version = v
+            self.awaiting_version = False
+            self._update_version_label()
+
     def _poll_serial_queue(self):
-        try:
-            while True:
-                msg = self.q.get_nowait()
-                if self.awaiting_version:
-                    m = re.search(r'FW_VERSION\s*[:=]?\s*([0-9]+\.[0-9]+\.[0-9]+)', msg)
-                    if m:
-                        self.device_version = m.group(1)
-                        self.awaiting_version = False
-                        self._update_version_label()
-                if self.show_output.get():
-                    self.log.insert('end', msg)
-                    self.log.see('end')
-        except queue.Empty:
-            pass
-        self.after(100, self._poll_serial_queue)
+        # the tab's single ~60 Hz tick: drain everything queued into the log
+        # once, show a version reply, and expire a stale version query
+        with self._qlock:
+            parts = list(self.q)
+            self.q.clear()
+        # with the log hidden (the default) queued lines are just discarded
+        if parts and self.show_output.get():
+            _append_log(self.log, b''.join(parts).decode(errors='replace'))
+        if self._version_event.is_set():
+            self._version_event.clear()
+            self._apply_version()
+        if self.awaiting_version and time.monotonic() >= self._version_deadline:
+            self._version_timeout()
+        self.after(16, self._poll_serial_queue)
 
     def send_cmd(self, cmd):
-        # prefer shared serial manager
         try:
-            if hasattr(self, 'serial_manager') and self.serial_manager:
-                if not self.serial_manager.is_open:
-                    messagebox.showwarning('Not Connected', 'Open a serial connection first.')
-                    return
-                self.serial_manager.write((cmd + '\n').encode())
-            else:
-                if not (self.serial and getattr(self.serial, 'is_open', False)):
-                    messagebox.showwarning('Not Connected', 'Open a serial connection first.')
-                    return
-                self.serial.write((cmd + '\n').encode())
+            if not self.serial_manager.is_open:
+                messagebox.showwarning('Not Connected', 'Open a serial connection first.')
+                return
+            self.serial_manager.write((cmd + '\n').encode())
             if self.show_output.get():
-                self.log.insert('end', f"> {cmd}\n")
-                self.log.see('end')
+                _append_log(self.log, f"> {cmd}\n")
         except Exception as e:
             messagebox.showerror('Send Failed', str(e))
 
     def query_device_version(self):
-        # prefer shared manager
-        if hasattr(self, 'serial_manager') and self.serial_manager:
-            if not self.serial_manager.is_open:
-                return
-        else:
-            if not (self.serial and getattr(self.serial, 'is_open', False)):
-                return
+        if not self.serial_manager.is_open:
+            return
+        self._version_seen = None
+        self._version_event.clear()
         self.awaiting_version = True
+        self._version_deadline = time.monotonic() + 2.0
         try:
             self.send_cmd('version')
         except Exception:
             pass
-        self.after(2000, self._version_timeout)
 
     def _version_timeout(self):
         if self.awaiting_version:
@@ -623,7 +1055,7 @@ class CalibratorTab(ttk.Frame):
             pass
 
     def open_calibration_dialog(self):
-        if not (self.serial and self.serial.is_open):
+        if not self.serial_manager.is_open:
             messagebox.showwarning('Not Connected', 'Open a serial connection first.')
             return
         try:
@@ -715,7 +1147,7 @@ class SettingsTab(ttk.Frame):
         self.refresh_ports()
 
     def refresh_ports(self):
-        vals = [p.device for p in serial.tools.list_ports.comports()]
+        vals = _list_ports()
         try:
             self.ports_cb['values'] = vals
         except Exception:
@@ -762,8 +1194,11 @@ class JoystickToolApp(ttk.Frame):
         nb.pack(fill='both', expand=True)
         self.port_var = tk.StringVar()
         self.serial_manager = SerialManager()
+        # background asyncio loop for firmware updates (download + esptool)
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
 
-        self.updater = UpdaterTab(nb, port_var=self.port_var, serial_manager=self.serial_manager)
+        self.updater = UpdaterTab(nb, port_var=self.port_var, serial_manager=self.serial_manager, loop=self._loop)
         nb.add(self.updater, text='Updater')
 
         self.calibrator = CalibratorTab(nb, port_var=self.port_var, serial_manager=self.serial_manager)
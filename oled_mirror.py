@@ -1,14 +1,19 @@
+import re
 import serial
 import serial.tools.list_ports
 import threading
 import tkinter as tk
 from PIL import Image, ImageDraw, ImageTk
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 OLED_W, OLED_H = 128, 64
 SCALE = 4
 BAUD = 115200
 
+# firmware debug line: "Raw: %d,%d | Norm: %.2f,%.2f | Dir: %s"
+RAW_RE = re.compile(rb"Raw: (-?\d+),(-?\d+) \| Norm: (-?[\d.]+),(-?[\d.]+) \| Dir: ([\w-]+)")
+
 raw_x = raw_y = 0
 norm_x = norm_y = 0.0
 direction = "CENTER"
@@ -22,25 +27,48 @@ cal = {
 # =========================
 # AUTO PORT DETECT
 # =========================
-def find_esp32():
-    ports = list(serial.tools.list_ports.comports())
-    for p in ports:
+def probe_port(dev):
+    ser = None
+    try:
+        ser = serial.Serial(dev, BAUD, timeout=1)
         try:
-            ser = serial.Serial(p.device, BAUD, timeout=1)
-            time.sleep(1)
-            ser.write(b"debug\n")
-            for _ in range(5):
-                line = ser.readline().decode(errors="ignore")
-                if "Raw:" in line:
-                    return ser
-            ser.close()
-        except:
+            ser.set_low_latency_mode(True)  # Linux FTDI/CH34x: no 16 ms batching
+        except Exception:
             pass
+        time.sleep(1)
+        ser.write(b"debug\n")
+        for _ in range(5):
+            if b"Raw:" in ser.readline():
+                return ser
+        ser.close()
+    except (serial.SerialException, OSError):
+        if ser:
+            ser.close()
     return None
 
+def find_esp32():
+    # probe every port at once, so detection takes as long as the slowest
+    # port rather than the sum of their 1 s settle + read timeouts
+    ports = [p.device for p in serial.tools.list_ports.comports()]
+    if not ports:
+        return None
+    found = None
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        for ser in ex.map(probe_port, ports):
+            if ser is None:
+                continue
+            if found is None:
+                found = ser
+            else:
+                ser.close()
+    return found
+
 # =========================
 # SERIAL THREAD
 # =========================
+# set whenever there is something new to draw; update() skips idle ticks
+dirty = threading.Event()
+
 def serial_worker():
     global raw_x, raw_y, norm_x, norm_y, direction
     ser = None
@@ -48,14 +76,25 @@ def serial_worker():
         ser = find_esp32()
         time.sleep(1)
 
+    # read whatever the driver has buffered and split lines here, instead of
+    # pyserial's byte-at-a-time readline(); only the newest sample is parsed
+    buf = bytearray()
     while True:
         try:
-            line = ser.readline().decode(errors="ignore").strip()
-            if "Raw:" in line:
-                parts = line.replace("|", "").split()
-                raw_x, raw_y = map(int, parts[1].split(","))
-                norm_x, norm_y = map(float, parts[4].split(","))
-                direction = parts[-1]
+            buf += ser.read(max(1, ser.in_waiting))
+            end = buf.rfind(b"\n")
+            if end < 0:
+                continue
+            lines = buf[:end].split(b"\n")
+            del buf[:end + 1]
+            for raw in reversed(lines):
+                m = RAW_RE.search(raw)
+                if m:
+                    raw_x, raw_y = int(m[1]), int(m[2])
+                    norm_x, norm_y = float(m[3]), float(m[4])
+                    direction = m[5].decode()
+                    dirty.set()
+                    break
         except:
             pass
 
@@ -65,21 +104,25 @@ def serial_worker():
 def capture_center():
     cal["cx"] = raw_x
     cal["cy"] = raw_y
+    dirty.set()
 
 def capture_minmax():
     cal["minx"] = min(cal["minx"], raw_x)
     cal["maxx"] = max(cal["maxx"], raw_x)
     cal["miny"] = min(cal["miny"], raw_y)
     cal["maxy"] = max(cal["maxy"], raw_y)
+    dirty.set()
 
 # =========================
 # OLED DRAW
 # =========================
-def draw_oled():
-    img = Image.new("1", (OLED_W, OLED_H))
-    d = ImageDraw.Draw(img)
+# one frame buffer, cleared and redrawn in place every frame
+oled_img = Image.new("1", (OLED_W, OLED_H))
+oled_draw = ImageDraw.Draw(oled_img)
 
-    d.rectangle((0, 0, OLED_W - 1, OLED_H - 1), outline=1)
+def draw_oled():
+    img, d = oled_img, oled_draw
+    d.rectangle((0, 0, OLED_W - 1, OLED_H - 1), fill=0, outline=1)
 
     cx, cy = OLED_W // 2, OLED_H // 2
     d.ellipse((cx-2, cy-2, cx+2, cy+2), fill=1)
@@ -101,6 +144,10 @@ root.title("ESP32 OLED Mirror + Calibration")
 canvas = tk.Canvas(root, width=OLED_W*SCALE, height=OLED_H*SCALE, bg="black")
 canvas.grid(row=0, column=0, rowspan=6)
 
+# a single PhotoImage/canvas item; update() pastes each new frame into it
+tk_img = ImageTk.PhotoImage("1", (OLED_W*SCALE, OLED_H*SCALE))
+canvas.create_image(0, 0, anchor="nw", image=tk_img)
+
 tk.Button(root, text="Capture Center", command=capture_center).grid(row=0, column=1, sticky="ew")
 tk.Button(root, text="Capture Min/Max", command=capture_minmax).grid(row=1, column=1, sticky="ew")
 
@@ -108,10 +155,12 @@ info = tk.Label(root, justify="left", font=("Consolas", 9))
 info.grid(row=2, column=1, sticky="nw")
 
 def update():
-    img = draw_oled().resize((OLED_W*SCALE, OLED_H*SCALE), Image.NEAREST)
-    tk_img = ImageTk.PhotoImage(img)
-    canvas.img = tk_img
-    canvas.create_image(0, 0, anchor="nw", image=tk_img)
+    if not dirty.is_set():
+        root.after(20, update)
+        return
+    dirty.clear()
+
+    tk_img.paste(draw_oled().resize((OLED_W*SCALE, OLED_H*SCALE), Image.NEAREST))
 
     info.config(text=
         f"RAW: {raw_x},{raw_y}\n"
@@ -129,5 +178,6 @@ def update():
 # START
 # =========================
 threading.Thread(target=serial_worker, daemon=True).start()
+dirty.set()
 update()
 root.mainloop()
@@ -1,11 +1,17 @@
+import math
+import re
 import serial
 import serial.tools.list_ports
 import threading
 import tkinter as tk
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 BAUD = 115200
 
+# firmware debug line: "Raw: %d,%d | Norm: %.2f,%.2f | Dir: %s"
+RAW_RE = re.compile(rb"Raw: (-?\d+),(-?\d+) \| Norm: (-?[\d.]+),(-?[\d.]+) \| Dir: ([\w-]+)")
+
 # =========================
 # RAW STATE
 # =========================
@@ -26,23 +32,48 @@ cal = {
 # =========================
 # AUTO PORT DETECT
 # =========================
-def find_esp32():
-    for p in serial.tools.list_ports.comports():
+def probe_port(dev):
+    ser = None
+    try:
+        ser = serial.Serial(dev, BAUD, timeout=1)
         try:
-            ser = serial.Serial(p.device, BAUD, timeout=1)
-            time.sleep(1)
-            ser.write(b"debug\n")
-            for _ in range(5):
-                if b"Raw:" in ser.readline():
-                    return ser
-            ser.close()
-        except:
+            ser.set_low_latency_mode(True)  # Linux FTDI/CH34x: no 16 ms batching
+        except Exception:
             pass
+        time.sleep(1)
+        ser.write(b"debug\n")
+        for _ in range(5):
+            if b"Raw:" in ser.readline():
+                return ser
+        ser.close()
+    except (serial.SerialException, OSError):
+        if ser:
+            ser.close()
     return None
 
+def find_esp32():
+    # probe every port at once, so detection takes as long as the slowest
+    # port rather than the sum of their 1 s settle + read timeouts
+    ports = [p.device for p in serial.tools.list_ports.comports()]
+    if not ports:
+        return None
+    found = None
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        for ser in ex.map(probe_port, ports):
+            if ser is None:
+                continue
+            if found is None:
+                found = ser
+            else:
+                ser.close()
+    return found
+
 # =========================
 # SERIAL THREAD
 # =========================
+# set whenever there is something new to draw; update() skips idle ticks
+dirty = threading.Event()
+
 def serial_worker():
     global raw_x, raw_y, norm_x, norm_y, direction
     ser = None
@@ -50,14 +81,25 @@ def serial_worker():
         ser = find_esp32()
         time.sleep(1)
 
+    # read whatever the driver has buffered and split lines here, instead of
+    # pyserial's byte-at-a-time readline(); only the newest sample is parsed
+    buf = bytearray()
     while True:
         try:
-            line = ser.readline().decode(errors="ignore")
-            if "Raw:" in line:
-                parts = line.replace("|", "").split()
-                raw_x, raw_y = map(int, parts[1].split(","))
-                norm_x, norm_y = map(float, parts[4].split(","))
-                direction = parts[-1]
+            buf += ser.read(max(1, ser.in_waiting))
+            end = buf.rfind(b"\n")
+            if end < 0:
+                continue
+            lines = buf[:end].split(b"\n")
+            del buf[:end + 1]
+            for raw in reversed(lines):
+                m = RAW_RE.search(raw)
+                if m:
+                    raw_x, raw_y = int(m[1]), int(m[2])
+                    norm_x, norm_y = float(m[3]), float(m[4])
+                    direction = m[5].decode()
+                    dirty.set()
+                    break
         except:
             pass
 
@@ -67,12 +109,13 @@ def serial_worker():
 def calibrated(val, c, mn, mx):
     if c is None or mx == mn:
         return 0.0
-    return (val - c) / (mx - c) if val >= c else (val - c) / (c - mn)
+    # a center captured on the min/max edge leaves that half with no span
+    span = mx - c if val >= c else c - mn
+    return (val - c) / span if span else 0.0
 
 def apply_deadzone(v, dz):
-    if abs(v) < dz:
-        return 0.0
-    return (v - dz if v > 0 else v + dz) / (1 - dz)
+    # shrink the magnitude by dz (never below 0) and keep the sign
+    return math.copysign(max(abs(v) - dz, 0.0) / (1 - dz), v)
 
 # =========================
 # TK UI (CREATE ROOT FIRST!)
@@ -90,25 +133,34 @@ joy_canvas = tk.Canvas(root, width=JOY_SIZE, height=JOY_SIZE, bg="#111", highlig
 joy_canvas.grid(row=0, column=0, rowspan=6, padx=10, pady=10)
 
 # Controls
+def capture_center():
+    cal.update(cx=raw_x, cy=raw_y)
+    dirty.set()
+
+def capture_minmax():
+    cal.update(
+        minx=min(cal["minx"], raw_x),
+        maxx=max(cal["maxx"], raw_x),
+        miny=min(cal["miny"], raw_y),
+        maxy=max(cal["maxy"], raw_y))
+    dirty.set()
+
 tk.Button(root, text="Capture Center",
-          command=lambda: cal.update(cx=raw_x, cy=raw_y)
+          command=capture_center
           ).grid(row=0, column=1, sticky="ew")
 
 tk.Button(root, text="Capture Min/Max",
-          command=lambda: cal.update(
-              minx=min(cal["minx"], raw_x),
-              maxx=max(cal["maxx"], raw_x),
-              miny=min(cal["miny"], raw_y),
-              maxy=max(cal["maxy"], raw_y))
+          command=capture_minmax
           ).grid(row=1, column=1, sticky="ew")
 
 tk.Checkbutton(root, text="Use Calibration",
                variable=use_cal, bg="#111", fg="white",
-               selectcolor="#111").grid(row=2, column=1, sticky="w")
+               selectcolor="#111", command=dirty.set).grid(row=2, column=1, sticky="w")
 
 dz_slider = tk.Scale(root, from_=0, to=0.25, resolution=0.01,
                      orient="horizontal", label="Deadzone",
-                     bg="#111", fg="white", highlightthickness=0)
+                     bg="#111", fg="white", highlightthickness=0,
+                     command=lambda _v: dirty.set())
 dz_slider.set(cal["deadzone"])
 dz_slider.grid(row=3, column=1, sticky="ew")
 
@@ -121,25 +173,41 @@ bar_y = tk.Canvas(root, width=BAR_W, height=22, bg="#111", highlightthickness=0)
 bar_y.grid(row=7, column=0, columnspan=2)
 
 # =========================
-# DRAW LOOP
+# CANVAS ITEMS (created once, moved by update)
 # =========================
-def update():
-    joy_canvas.delete("all")
+pad = 20
+cx = JOY_SIZE // 2
+cy = JOY_SIZE // 2
+radius = JOY_SIZE // 2 - pad
+
+# Frame
+joy_canvas.create_rectangle(pad, pad, JOY_SIZE-pad, JOY_SIZE-pad, outline="#555")
+joy_canvas.create_line(cx, pad, cx, JOY_SIZE-pad, fill="#222")
+joy_canvas.create_line(pad, cy, JOY_SIZE-pad, cy, fill="#222")
 
-    pad = 20
-    cx = JOY_SIZE // 2
-    cy = JOY_SIZE // 2
-    radius = JOY_SIZE // 2 - pad
+dz_oval = joy_canvas.create_oval(cx, cy, cx, cy, outline="#333")
+stick_dot = joy_canvas.create_oval(cx-7, cy-7, cx+7, cy+7, fill="white")
 
-    # Frame
-    joy_canvas.create_rectangle(pad, pad, JOY_SIZE-pad, JOY_SIZE-pad, outline="#555")
-    joy_canvas.create_line(cx, pad, cx, JOY_SIZE-pad, fill="#222")
-    joy_canvas.create_line(pad, cy, JOY_SIZE-pad, cy, fill="#222")
+bars = []
+for bar in (bar_x, bar_y):
+    bar.create_rectangle(0, 6, BAR_W, 16, outline="#333")
+    bars.append((bar,
+                 bar.create_rectangle(BAR_W//2, 6, BAR_W//2, 16, fill="white"),
+                 bar.create_text(8, 11, fill="white", anchor="w")))
+
+# =========================
+# DRAW LOOP
+# =========================
+def update():
+    if not dirty.is_set():
+        root.after(16, update)
+        return
+    dirty.clear()
 
     # Deadzone
     dz = dz_slider.get()
     dzr = radius * dz
-    joy_canvas.create_oval(cx-dzr, cy-dzr, cx+dzr, cy+dzr, outline="#333")
+    joy_canvas.coords(dz_oval, cx-dzr, cy-dzr, cx+dzr, cy+dzr)
 
     # Value selection
     if use_cal.get():
@@ -151,14 +219,12 @@ def update():
     # Stick dot
     px = cx + vx * radius * 0.85
     py = cy - vy * radius * 0.85
-    joy_canvas.create_oval(px-7, py-7, px+7, py+7, fill="white")
+    joy_canvas.coords(stick_dot, px-7, py-7, px+7, py+7)
 
     # Bars
-    for bar, val, label in [(bar_x, vx, "X"), (bar_y, -vy, "Y")]:
-        bar.delete("all")
-        bar.create_rectangle(0, 6, BAR_W, 16, outline="#333")
-        bar.create_rectangle(BAR_W//2, 6, BAR_W//2 + val*(BAR_W//2-4), 16, fill="white")
-        bar.create_text(8, 11, text=f"{label} {int(val*100)}%", fill="white", anchor="w")
+    for (bar, fill, text), val, label in zip(bars, (vx, -vy), "XY"):
+        bar.coords(fill, BAR_W//2, 6, BAR_W//2 + val*(BAR_W//2-4), 16)
+        bar.itemconfigure(text, text=f"{label} {int(val*100)}%")
 
     info.config(text=
         f"CENTER: {cal['cx']},{cal['cy']}\n"
@@ -173,5 +239,6 @@ def update():
 # START
 # =========================
 threading.Thread(target=serial_worker, daemon=True).start()
+dirty.set()
 update()
 root.mainloop()